@@ -7,9 +7,10 @@ BOT_TOKEN remains in .env. Other params: TOML in DB, fallback from .env when see
 import os
 import logging
 from pathlib import Path
+from datetime import UTC, tzinfo
 from typing import List, Optional, Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from dotenv import load_dotenv
-import pytz
 
 load_dotenv()
 
@@ -66,13 +67,13 @@ class Config:
             cls.ADMIN_USER_IDS = _admin_ids_from_value(config["admin_user_ids"])
     
     @classmethod
-    def get_timezone(cls) -> pytz.timezone:
+    def get_timezone(cls) -> tzinfo:
         """Get the configured timezone object."""
         try:
-            return pytz.timezone(cls.TIMEZONE)
-        except pytz.exceptions.UnknownTimeZoneError:
+            return ZoneInfo(cls.TIMEZONE)
+        except (ZoneInfoNotFoundError, ValueError):
             logging.warning(f"Unknown timezone '{cls.TIMEZONE}', using UTC")
-            return pytz.UTC
+            return UTC
     
     @classmethod
     def validate(cls) -> List[str]:
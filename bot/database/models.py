@@ -213,7 +213,7 @@ _Обновлено: {updated_at}_"""
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FlyableWindow:
     """
     A flyable weather window in the forecast.
@@ -8,7 +8,7 @@ import logging
 import os
 import signal
 import sys
-from datetime import datetime
+from datetime import datetime, tzinfo
 from pathlib import Path
 
 import toml
@@ -21,7 +21,6 @@ from telegram.ext import (
 )
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-import pytz
 
 from .config import Config, DEFAULT_DATABASE_PATH
 from .database import Database
@@ -170,7 +169,7 @@ class WeatherBot:
         
         logger.debug("Command handlers registered")
     
-    def _setup_scheduler(self, timezone: pytz.timezone) -> None:
+    def _setup_scheduler(self, timezone: tzinfo) -> None:
         """Setup periodic weather check scheduler."""
         self.scheduler = AsyncIOScheduler(timezone=timezone)
         
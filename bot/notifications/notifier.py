@@ -6,13 +6,12 @@ Handles state tracking and notification logic.
 import asyncio
 import json
 import logging
-from datetime import datetime
+from datetime import UTC, datetime, tzinfo
 from typing import Optional, Dict, Any, List
 
 from telegram import Bot
 from telegram.constants import ParseMode
 from telegram.error import TelegramError
-import pytz
 
 from .templates import MessageTemplates
 from ..database import Database, Location, WeatherStatus, WeatherCheck, WeatherForecast, FlyableWindow
@@ -155,7 +154,7 @@ class Notifier:
         db: Database,
         openweather: OpenWeatherClient,
         visualcrossing: VisualCrossingClient,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ):
         """
         Initialize the notifier.
@@ -5,16 +5,227 @@ Uses MarkdownV2 format for Telegram.
 
 from __future__ import annotations
 
+import io
+import json
 import re
-from datetime import datetime
+import string
+import time
+from datetime import UTC, date, datetime, tzinfo
+from functools import lru_cache
 from typing import Optional, List, TYPE_CHECKING
-import pytz
 
 from ..database.models import Location, ChatSettings, FlyableWindow
+from ..weather.compass import wind_direction_name
 
 if TYPE_CHECKING:
     from ..weather.analyzer import FullForecastAnalysis, FlyableWindowInfo
 
+# MarkdownV2 special characters and the translation table escaping them
+_MD2_META = frozenset(r'_*[]()~`>#+-=|{}.!')
+_MD2_TRANS = str.maketrans({c: '\\' + c for c in _MD2_META})
+_NEEDS_ESCAPE_RE = re.compile(r'[_*\[\]()~`>#+=|{}.!-]')
+# Control character used to join values escaped together by escape_many
+_ESCAPE_MANY_SEP = "\x01"
+
+
+def _escape_md2(text) -> str:
+    """Escape special characters for MarkdownV2 (see MessageTemplates.escape_markdown)."""
+    if not text:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
+    # Most values (numbers, names, compass points) need no escaping
+    if _NEEDS_ESCAPE_RE.search(text) is None:
+        return text
+    return text.translate(_MD2_TRANS)
+
+
+@lru_cache(maxsize=128)
+def _escaped_name(name: str) -> str:
+    """Escaped location name; names repeat across every message of a cycle."""
+    return _escape_md2(name)
+
+
+# Condition keywords, one group per emoji; a lower group number wins
+_WEATHER_RE = re.compile(
+    r"(rain|дождь)|(snow|снег)|(cloud|облач)|(clear|ясно)|(thunder|гроз)|(fog|туман)",
+    re.IGNORECASE,
+)
+_WEATHER_EMOJI = ("🌧", "🌨", "☁️", "☀️", "⛈", "🌫")
+
+_DAYS_RU = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+
+
+@lru_cache(maxsize=1024)
+def _fmt_window_date(d: str, with_year: bool = False) -> str:
+    """
+    Format a YYYY-MM-DD window date as 'Пн, 15.01' or, with_year, 'Пн, 15.01.2024'.
+    
+    Falls back to the raw string when it is not a valid date.
+    """
+    try:
+        day = date(int(d[0:4]), int(d[5:7]), int(d[8:10]))
+    except (TypeError, ValueError):
+        return d
+    if with_year:
+        return f"{_DAYS_RU[day.weekday()]}, {day.day:02d}.{day.month:02d}.{day.year}"
+    return f"{_DAYS_RU[day.weekday()]}, {day.day:02d}.{day.month:02d}"
+
+
+@lru_cache(maxsize=32)
+def _fmt_updated_at(timezone, minute_epoch: int) -> str:
+    """MarkdownV2-escaped 'HH:MM DD.MM.YYYY' for the given minute in timezone."""
+    dt = datetime.fromtimestamp(minute_epoch * 60, timezone)
+    return _escape_md2(dt.strftime("%H:%M %d.%m.%Y"))
+
+
+def _updated_at(timezone) -> str:
+    """Escaped 'updated at' stamp for the current minute (shared by all formatters)."""
+    return _fmt_updated_at(timezone, int(time.time()) // 60)
+
+
+@lru_cache(maxsize=64)
+def _template_fields(template: str) -> frozenset:
+    """Names of the top-level replacement fields used by a custom template."""
+    return frozenset(
+        name.partition(".")[0].partition("[")[0]
+        for _, name, _, _ in string.Formatter().parse(template)
+        if name
+    )
+
+
+@lru_cache(maxsize=256, typed=True)
+def _escaped_setting(value) -> str:
+    """Escaped str() of a location setting; thresholds repeat across renders."""
+    return _escape_md2(str(value))
+
+
+@lru_cache(maxsize=256)
+def _wind_dirs_display(wind_directions: str) -> str:
+    """Escaped compass names for a Location.wind_directions JSON string."""
+    try:
+        dirs = json.loads(wind_directions)
+    except (TypeError, json.JSONDecodeError):
+        dirs = []
+    if not dirs:
+        return "все"
+    return _escape_md2(", ".join([wind_direction_name(d) for d in dirs]))
+
+
+_SOURCE_LABELS = {
+    "both": "Оба",
+    "openweather": "OpenWeather",
+    "visualcrossing": "VisualCrossing",
+    "mixed": "Оба источника",
+}
+
+
+@lru_cache(maxsize=16)
+def _source_label(source: str) -> str:
+    """Human-readable label for forecast source (memoized)."""
+    if not isinstance(source, str):
+        return "—"
+    return _SOURCE_LABELS.get((source or "both").lower(), source)
+
+
+@lru_cache(maxsize=16)
+def _escaped_source_label(source: str) -> str:
+    """MarkdownV2-escaped source label."""
+    return _escape_md2(_source_label(source))
+
+
+def _escape_number(s: str) -> str:
+    """Escape a formatted number; only '.' and '-' can need escaping."""
+    return s.replace(".", "\\.").replace("-", "\\-")
+
+
+def _fmt_num(value, spec: str = ".1f") -> str:
+    """Number formatted with ``spec`` as MarkdownV2-safe text, or '—' when missing."""
+    if value is None:
+        return "—"
+    return _escape_number(format(value, spec))
+
+
+def _opt_int(value) -> str:
+    """Integer value as MarkdownV2-safe text, or '—' when missing."""
+    if value is None:
+        return "—"
+    return str(int(value)).replace("-", "\\-")
+
+
+# Escaped placeholder values, in the order the formatters compute them
+_FLYABLE_FIELDS = (
+    "location_name", "date", "flyable_window", "temp_range", "wind_info",
+    "humidity", "cloud_base_m", "fog_probability", "continuous_hours",
+    "humidity_max",
+)
+_NOT_FLYABLE_FIELDS = (
+    "location_name", "date", "temp", "wind_speed", "wind_direction",
+    "humidity", "cloud_base_m", "fog_probability",
+)
+
+# Default notification templates (placeholders are filled with escaped values)
+_FLYABLE_TEMPLATE = """✅🪂 *ЛЁТНАЯ ПОГОДА\\!*
+
+📍 *Локация:* {location_name}
+📅 *Дата:* {date}
+⏰ *Лётное окно:* {flyable_window} \\({continuous_hours} ч\\.\\)
+
+*Условия:*
+🌡 Температура: {temp_range}
+💨 Ветер: {wind_info}
+💧 Влажность: до {humidity_max}%
+☁️ Высота облаков: {cloud_base_m} м
+🌫 Вероятность тумана: {fog_probability}%
+
+_Данные подтверждены двумя источниками_
+_Обновлено: {updated_at}_"""
+
+_NOT_FLYABLE_TEMPLATE = """❌🌧️ *СТАЛО НЕ ЛЁТНО*
+
+📍 *Локация:* {location_name}
+📅 *Дата:* {date}
+
+*Причины отмены:*
+{rejection_reasons}
+
+*Текущие условия:*
+🌡 Температура: {temp}°C
+💨 Ветер: {wind_speed} м/с, {wind_direction}
+💧 Влажность: {humidity}%
+☁️ Высота облаков: {cloud_base_m} м
+🌫 Вероятность тумана: {fog_probability}%
+
+_Обновлено: {updated_at}_"""
+
+_FLYWINDOW_ROW = (
+    "📅 *{date}*\n"
+    "   ⏰ {sh:02d}:00 \\- {eh:02d}:00 \\({dur} ч\\) \\({src}\\)\n"
+    "   🌡 Температура: {avg_t}°C \\(мин\\. {min_t} \\- макс\\. {max_t}°C\\)\n"
+    "   💨 Ветер: ср\\. {avg_w} м/с, макс\\. {max_w} м/с\n"
+    "   💧 Влажность: ср\\. {hum}%\n"
+    "   🌧 Вероятность осадков: макс\\. {prc}%\n"
+    "   ☁️ Высота облаков: {cb} м\n"
+    "   🌫 Вероятность тумана: {fp}%\n"
+)
+
+_CUR_WEATHER_TPL = """{emoji} *Текущая погода: {name}*
+
+🌡 *Температура:* {temp}°C
+🤒 *Ощущается:* {feels}°C
+
+💨 *Ветер:* {wind} м/с, {wind_dir_name}{gust_line}
+
+💧 *Влажность:* {humidity}%
+🌫 *Точка росы:* {dew_point}°C \\(разница: {dew_spread}°C\\)
+☁️ *Высота облаков:* {cloud_base} м
+🌫 *Вероятность тумана:* {fog}%
+🔭 *Видимость:* {visibility} км
+🌡 *Давление:* {pressure} гПа{condition_line}
+
+_Источники: {sources}_
+_Обновлено: {updated_at}_"""
+
 
 class MessageTemplates:
     """
@@ -37,9 +248,21 @@ class MessageTemplates:
         Returns:
             Escaped text safe for MarkdownV2
         """
-        if not text:
-            return ""
-        return re.sub(r'([_*\[\]()~`>#+=|{}.!-])', r'\\\1', str(text))
+        return _escape_md2(text)
+
+    @classmethod
+    def escape_many(cls, *texts) -> List[str]:
+        """
+        Escape several values for MarkdownV2 in a single pass.
+        
+        Args:
+            texts: Raw values to escape (falsy values become "")
+        
+        Returns:
+            Escaped values in the same order
+        """
+        joined = _ESCAPE_MANY_SEP.join(str(t) if t else "" for t in texts)
+        return joined.translate(_MD2_TRANS).split(_ESCAPE_MANY_SEP)
 
     @staticmethod
     def escape_html(text: str) -> str:
@@ -54,7 +277,7 @@ class MessageTemplates:
         result,  # AnalysisResult or FullForecastAnalysis
         location: Location,
         template: Optional[str] = None,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format a "flyable weather" notification message.
@@ -68,7 +291,7 @@ class MessageTemplates:
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         
         # Build flyable window string
         flyable_window = "—"
@@ -78,48 +301,41 @@ class MessageTemplates:
         # Build temperature range from location settings (min only)
         temp_range = f"≥{location.temp_min}°C"
         
+        cws, cwd = result.current_wind_speed, result.current_wind_direction
+        ch, ccb, cfp = (
+            result.current_humidity,
+            result.current_cloud_base_m,
+            result.current_fog_probability,
+        )
+        
         # Build wind info
         wind_info = "—"
-        if result.current_wind_speed is not None:
-            wind_dir_name = cls._get_wind_direction_name(result.current_wind_direction or 0)
-            wind_info = f"{result.current_wind_speed:.1f} м/с, {wind_dir_name}"
+        if cws is not None:
+            wind_dir_name = cls._get_wind_direction_name(cwd or 0)
+            wind_info = f"{cws:.1f} м/с, {wind_dir_name}"
         
         # Format values
-        values = {
-            "location_name": cls.escape_markdown(result.location_name),
-            "date": cls.escape_markdown(result.date),
-            "flyable_window": cls.escape_markdown(flyable_window),
-            "temp_range": cls.escape_markdown(temp_range),
-            "wind_info": cls.escape_markdown(wind_info),
-            "humidity": cls.escape_markdown(str(int(result.current_humidity or 0))),
-            "cloud_base_m": cls.escape_markdown(str(int(result.current_cloud_base_m or 0))),
-            "fog_probability": cls.escape_markdown(str(int(result.current_fog_probability or 0))),
-            "updated_at": cls.escape_markdown(now.strftime("%H:%M %d.%m.%Y")),
-            "continuous_hours": cls.escape_markdown(str(result.continuous_hours)),
-        }
-        
-        if template:
-            try:
-                return template.format(**values)
-            except KeyError:
-                pass
-        
-        # Default template
-        return f"""✅🪂 *ЛЁТНАЯ ПОГОДА\\!*
-
-📍 *Локация:* {values['location_name']}
-📅 *Дата:* {values['date']}
-⏰ *Лётное окно:* {values['flyable_window']} \\({values['continuous_hours']} ч\\.\\)
-
-*Условия:*
-🌡 Температура: {values['temp_range']}
-💨 Ветер: {values['wind_info']}
-💧 Влажность: до {cls.escape_markdown(str(location.humidity_max))}%
-☁️ Высота облаков: {values['cloud_base_m']} м
-🌫 Вероятность тумана: {values['fog_probability']}%
-
-_Данные подтверждены двумя источниками_
-_Обновлено: {values['updated_at']}_"""
+        values = dict(zip(
+            _FLYABLE_FIELDS,
+            cls.escape_many(
+                result.location_name,
+                result.date,
+                flyable_window,
+                temp_range,
+                wind_info,
+                str(int(ch or 0)),
+                str(int(ccb or 0)),
+                str(int(cfp or 0)),
+                str(result.continuous_hours),
+                str(location.humidity_max),
+            ),
+        ))
+        values["updated_at"] = updated_at
+        
+        if template and _template_fields(template) <= values.keys():
+            return template.format_map(values)
+        
+        return _FLYABLE_TEMPLATE.format_map(values)
     
     @classmethod
     def format_not_flyable_message(
@@ -127,7 +343,7 @@ _Обновлено: {values['updated_at']}_"""
         result,  # AnalysisResult or FullForecastAnalysis
         location: Location,
         template: Optional[str] = None,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format a "not flyable weather" notification message.
@@ -141,65 +357,58 @@ _Обновлено: {values['updated_at']}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         
         # Build rejection reasons list
-        reasons_list = []
-        for reason in result.rejection_reasons:
-            escaped_reason = cls.escape_markdown(reason)
-            reasons_list.append(f"• {escaped_reason}")
-        
-        rejection_reasons = "\n".join(reasons_list) if reasons_list else "• Условия не соответствуют критериям"
+        esc = cls.escape_markdown
+        reasons = result.rejection_reasons
+        rejection_reasons = (
+            "\n".join(f"• {esc(r)}" for r in reasons)
+            if reasons else "• Условия не соответствуют критериям"
+        )
+        
+        ct, cws, cwd, ch, ccb, cfp = (
+            result.current_temp,
+            result.current_wind_speed,
+            result.current_wind_direction,
+            result.current_humidity,
+            result.current_cloud_base_m,
+            result.current_fog_probability,
+        )
         
         # Wind direction
         wind_direction = "—"
-        if result.current_wind_direction is not None:
-            wind_direction = cls._get_wind_direction_name(result.current_wind_direction)
+        if cwd is not None:
+            wind_direction = cls._get_wind_direction_name(cwd)
         
         # Format values
-        values = {
-            "location_name": cls.escape_markdown(result.location_name),
-            "date": cls.escape_markdown(result.date),
-            "rejection_reasons": rejection_reasons,
-            "temp": cls.escape_markdown(f"{result.current_temp:.1f}" if result.current_temp else "—"),
-            "wind_speed": cls.escape_markdown(f"{result.current_wind_speed:.1f}" if result.current_wind_speed else "—"),
-            "wind_direction": cls.escape_markdown(wind_direction),
-            "humidity": cls.escape_markdown(str(int(result.current_humidity or 0))),
-            "cloud_base_m": cls.escape_markdown(str(int(result.current_cloud_base_m or 0))),
-            "fog_probability": cls.escape_markdown(str(int(result.current_fog_probability or 0))),
-            "updated_at": cls.escape_markdown(now.strftime("%H:%M %d.%m.%Y")),
-        }
-        
-        if template:
-            try:
-                return template.format(**values)
-            except KeyError:
-                pass
-        
-        # Default template
-        return f"""❌🌧️ *СТАЛО НЕ ЛЁТНО*
-
-📍 *Локация:* {values['location_name']}
-📅 *Дата:* {values['date']}
-
-*Причины отмены:*
-{values['rejection_reasons']}
-
-*Текущие условия:*
-🌡 Температура: {values['temp']}°C
-💨 Ветер: {values['wind_speed']} м/с, {values['wind_direction']}
-💧 Влажность: {values['humidity']}%
-☁️ Высота облаков: {values['cloud_base_m']} м
-🌫 Вероятность тумана: {values['fog_probability']}%
-
-_Обновлено: {values['updated_at']}_"""
+        values = dict(zip(
+            _NOT_FLYABLE_FIELDS,
+            cls.escape_many(
+                result.location_name,
+                result.date,
+                f"{ct:.1f}" if ct else "—",
+                f"{cws:.1f}" if cws else "—",
+                wind_direction,
+                str(int(ch or 0)),
+                str(int(ccb or 0)),
+                str(int(cfp or 0)),
+            ),
+        ))
+        values["rejection_reasons"] = rejection_reasons
+        values["updated_at"] = updated_at
+        
+        if template and _template_fields(template) <= values.keys():
+            return template.format_map(values)
+        
+        return _NOT_FLYABLE_TEMPLATE.format_map(values)
     
     @classmethod
     def format_status_message(
         cls,
         result,  # AnalysisResult or FullForecastAnalysis
         location: Location,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format a status check message (not a notification).
@@ -212,7 +421,7 @@ _Обновлено: {values['updated_at']}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         
         status_emoji = "✅🪂" if result.is_flyable else "❌"
         status_text = "ЛЁТНО" if result.is_flyable else "НЕ ЛЁТНО"
@@ -223,43 +432,53 @@ _Обновлено: {values['updated_at']}_"""
             hours = [f"{h:02d}:00" for h in result.flyable_hours]
             flyable_hours_str = ", ".join(hours)
         
+        ct, cws, cwd, ch, ccb, cfp = (
+            result.current_temp,
+            result.current_wind_speed,
+            result.current_wind_direction,
+            result.current_humidity,
+            result.current_cloud_base_m,
+            result.current_fog_probability,
+        )
+        
         # Wind direction name
         wind_dir_name = "—"
-        if result.current_wind_direction is not None:
-            wind_dir_name = cls._get_wind_direction_name(result.current_wind_direction)
+        if cwd is not None:
+            wind_dir_name = cls._get_wind_direction_name(cwd)
         
-        message = f"""{status_emoji} *Статус: {cls.escape_markdown(status_text)}*
+        parts = [f"""{status_emoji} *Статус: {cls.escape_markdown(status_text)}*
 
-📍 *Локация:* {cls.escape_markdown(result.location_name)}
+📍 *Локация:* {_escaped_name(result.location_name)}
 📅 *Дата:* {cls.escape_markdown(result.date)}
 
 *Текущая погода:*
-🌡 Температура: {cls.escape_markdown(f'{result.current_temp:.1f}' if result.current_temp else '—')}°C
-💨 Ветер: {cls.escape_markdown(f'{result.current_wind_speed:.1f}' if result.current_wind_speed else '—')} м/с, {cls.escape_markdown(wind_dir_name)}
-💧 Влажность: {cls.escape_markdown(str(int(result.current_humidity or 0)))}%
-☁️ Высота облаков: {cls.escape_markdown(str(int(result.current_cloud_base_m or 0)))} м
-🌫 Вероятность тумана: {cls.escape_markdown(str(int(result.current_fog_probability or 0)))}%
+🌡 Температура: {_fmt_num(ct or None)}°C
+💨 Ветер: {_fmt_num(cws or None)} м/с, {cls.escape_markdown(wind_dir_name)}
+💧 Влажность: {_opt_int(ch or 0)}%
+☁️ Высота облаков: {_opt_int(ccb or 0)} м
+🌫 Вероятность тумана: {_opt_int(cfp or 0)}%
 
 *Лётные часы:* {cls.escape_markdown(flyable_hours_str)}
 *Требуется непрерывно:* {location.required_conditions_duration_hours} ч\\.
-"""
+"""]
         
         if result.is_flyable:
-            message += f"""
+            parts.append(f"""
 *Лётное окно:* {cls.escape_markdown(result.flyable_window_start or '—')} — {cls.escape_markdown(result.flyable_window_end or '—')}
-"""
+""")
         else:
-            reasons = "\n".join([f"• {cls.escape_markdown(r)}" for r in result.rejection_reasons])
-            message += f"""
+            esc = cls.escape_markdown
+            reasons = "\n".join(f"• {esc(r)}" for r in result.rejection_reasons)
+            parts.append(f"""
 *Причины:*
 {reasons}
-"""
+""")
         
-        message += f"""
+        parts.append(f"""
 _OpenWeather: {'✅' if result.openweather_available else '❌'} \\| VisualCrossing: {'✅' if result.visualcrossing_available else '❌'}_
-_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
+_Обновлено: {updated_at}_""")
         
-        return message
+        return "".join(parts)
     
     @classmethod
     def format_location_list(
@@ -278,26 +497,28 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
             title += f" для {cls.escape_markdown(chat_title)}"
         title += "*\n\n"
         
-        lines = [title]
+        buf = io.StringIO()
+        w = buf.write
+        esc = cls.escape_markdown
+        setting = _escaped_setting
+        w(title)
         
         for i, loc in enumerate(locations, 1):
             status = "✅" if loc.is_active else "⏸"
-            wind_dirs = loc.get_wind_directions_list()
-            wind_dirs_str = ", ".join([cls._get_wind_direction_name(d) for d in wind_dirs]) if wind_dirs else "все"
             
-            lines.append(f"{status} *{i}\\. {cls.escape_markdown(loc.name)}*")
-            lines.append(f"   📌 Координаты: `{loc.latitude:.4f}, {loc.longitude:.4f}`")
-            lines.append(f"   ⏰ Окно: {loc.time_window_start:02d}:00 \\- {loc.time_window_end:02d}:00")
-            lines.append(f"   ⏱ Мин\\. непрерывно: {loc.required_conditions_duration_hours} ч\\.")
-            lines.append(f"   🌡 Температура: ≥{cls.escape_markdown(str(loc.temp_min))}°C")
-            lines.append(f"   💧 Влажность макс\\.: {cls.escape_markdown(str(loc.humidity_max))}%")
-            lines.append(f"   💨 Ветер макс\\.: {cls.escape_markdown(str(loc.wind_speed_max))} м/с, порывы до {cls.escape_markdown(str(loc.wind_gust_max))} м/с")
-            lines.append(f"   🧭 Направления ветра: {cls.escape_markdown(wind_dirs_str)}, допуск ±{loc.wind_direction_tolerance}° \\(по компасу\\)")
-            lines.append(f"   🌫 Мин\\. разница с точкой росы: {cls.escape_markdown(str(loc.dew_point_spread_min))}°C")
-            lines.append(f"   🌧 Макс\\. вероятность осадков: {cls.escape_markdown(str(loc.precipitation_probability_max))}%")
-            lines.append("")
-        
-        return "\n".join(lines)
+            w(f"\n{status} *{i}\\. {esc(loc.name)}*")
+            w(f"\n   📌 Координаты: `{loc.latitude:.4f}, {loc.longitude:.4f}`")
+            w(f"\n   ⏰ Окно: {loc.time_window_start:02d}:00 \\- {loc.time_window_end:02d}:00")
+            w(f"\n   ⏱ Мин\\. непрерывно: {loc.required_conditions_duration_hours} ч\\.")
+            w(f"\n   🌡 Температура: ≥{setting(loc.temp_min)}°C")
+            w(f"\n   💧 Влажность макс\\.: {setting(loc.humidity_max)}%")
+            w(f"\n   💨 Ветер макс\\.: {setting(loc.wind_speed_max)} м/с, порывы до {setting(loc.wind_gust_max)} м/с")
+            w(f"\n   🧭 Направления ветра: {_wind_dirs_display(loc.wind_directions)}, допуск ±{loc.wind_direction_tolerance}° \\(по компасу\\)")
+            w(f"\n   🌫 Мин\\. разница с точкой росы: {setting(loc.dew_point_spread_min)}°C")
+            w(f"\n   🌧 Макс\\. вероятность осадков: {setting(loc.precipitation_probability_max)}%")
+            w("\n")
+        
+        return buf.getvalue()
     
     @classmethod
     def format_config_message(
@@ -313,10 +534,9 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        wind_dirs = location.get_wind_directions_list()
-        wind_dirs_str = ", ".join([cls._get_wind_direction_name(d) for d in wind_dirs]) if wind_dirs else "все"
+        setting = _escaped_setting
         
-        return f"""⚙️ *Конфигурация: {cls.escape_markdown(location.name)}*
+        return f"""⚙️ *Конфигурация: {_escaped_name(location.name)}*
 
 *Координаты:*
 📌 Широта: `{location.latitude}`
@@ -328,20 +548,20 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
 ⏱ Мин\\. непрерывно: {location.required_conditions_duration_hours} ч\\.
 
 *Температура:*
-🌡 Минимум: {cls.escape_markdown(str(location.temp_min))}°C
+🌡 Минимум: {setting(location.temp_min)}°C
 
 *Влажность:*
-💧 Максимум: {cls.escape_markdown(str(location.humidity_max))}%
+💧 Максимум: {setting(location.humidity_max)}%
 
 *Ветер:*
-💨 Макс\\. скорость: {cls.escape_markdown(str(location.wind_speed_max))} м/с
-🌬 Макс\\. порывы: {cls.escape_markdown(str(location.wind_gust_max))} м/с
-🧭 Направления: {cls.escape_markdown(wind_dirs_str)}
+💨 Макс\\. скорость: {setting(location.wind_speed_max)} м/с
+🌬 Макс\\. порывы: {setting(location.wind_gust_max)} м/с
+🧭 Направления: {_wind_dirs_display(location.wind_directions)}
 🎯 Допуск: ±{location.wind_direction_tolerance}° \\(по компасу\\)
 
 *Дополнительно:*
-🌫 Мин\\. разница с точкой росы: {cls.escape_markdown(str(location.dew_point_spread_min))}°C
-🌧 Макс\\. вероятность осадков: {cls.escape_markdown(str(location.precipitation_probability_max))}%
+🌫 Мин\\. разница с точкой росы: {setting(location.dew_point_spread_min)}°C
+🌧 Макс\\. вероятность осадков: {setting(location.precipitation_probability_max)}%
 
 *Статус:* {'✅ Активна' if location.is_active else '⏸ Приостановлена'}"""
     
@@ -363,13 +583,10 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        from datetime import datetime
-        import pytz
-        
         if timezone is None:
-            timezone = pytz.UTC
+            timezone = UTC
         
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         
         # Get values with defaults
         temp = weather_data.get("temperature")
@@ -397,64 +614,39 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         # Determine weather emoji
         weather_emoji = "🌤"
         if condition:
-            condition_lower = condition.lower()
-            if "rain" in condition_lower or "дождь" in condition_lower:
-                weather_emoji = "🌧"
-            elif "snow" in condition_lower or "снег" in condition_lower:
-                weather_emoji = "🌨"
-            elif "cloud" in condition_lower or "облач" in condition_lower:
-                weather_emoji = "☁️"
-            elif "clear" in condition_lower or "ясно" in condition_lower:
-                weather_emoji = "☀️"
-            elif "thunder" in condition_lower or "гроз" in condition_lower:
-                weather_emoji = "⛈"
-            elif "fog" in condition_lower or "туман" in condition_lower:
-                weather_emoji = "🌫"
-        
-        # Format values
-        temp_str = f"{temp:.1f}" if temp is not None else "—"
-        feels_str = f"{feels_like:.1f}" if feels_like is not None else "—"
-        humidity_str = str(int(humidity)) if humidity is not None else "—"
-        wind_str = f"{wind_speed:.1f}" if wind_speed is not None else "—"
-        gust_str = f"{wind_gust:.1f}" if wind_gust is not None else None
-        wind_dir_str = str(int(wind_dir)) if wind_dir is not None else "—"
-        cloud_base_str = str(int(cloud_base_m)) if cloud_base_m is not None else "—"
-        fog_str = str(int(fog_probability)) if fog_probability is not None else "—"
-        pressure_str = str(int(pressure)) if pressure is not None else "—"
-        visibility_str = f"{visibility:.1f}" if visibility is not None else "—"
-        dew_point_str = f"{dew_point:.1f}" if dew_point is not None else "—"
-        dew_spread_str = f"{dew_spread:.1f}" if dew_spread is not None else "—"
-        
-        # Build message
-        message = f"""{weather_emoji} *Текущая погода: {cls.escape_markdown(location.name)}*
-
-🌡 *Температура:* {cls.escape_markdown(temp_str)}°C
-🤒 *Ощущается:* {cls.escape_markdown(feels_str)}°C
-
-💨 *Ветер:* {cls.escape_markdown(wind_str)} м/с, {cls.escape_markdown(wind_dir_name)}"""
-
-        if gust_str:
-            message += f"\n🌬 *Порывы:* {cls.escape_markdown(gust_str)} м/с"
-
-        message += f"""
-
-💧 *Влажность:* {cls.escape_markdown(humidity_str)}%
-🌫 *Точка росы:* {cls.escape_markdown(dew_point_str)}°C \\(разница: {cls.escape_markdown(dew_spread_str)}°C\\)
-☁️ *Высота облаков:* {cls.escape_markdown(cloud_base_str)} м
-🌫 *Вероятность тумана:* {cls.escape_markdown(fog_str)}%
-🔭 *Видимость:* {cls.escape_markdown(visibility_str)} км
-🌡 *Давление:* {cls.escape_markdown(pressure_str)} гПа"""
-
-        if condition:
-            message += f"\n\n📋 *Условия:* {cls.escape_markdown(condition)}"
-
-        sources_str = ", ".join(sources) if sources else "—"
-        message += f"""
-
-_Источники: {cls.escape_markdown(sources_str)}_
-_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
-
-        return message
+            group = min((m.lastindex for m in _WEATHER_RE.finditer(condition)), default=None)
+            if group is not None:
+                weather_emoji = _WEATHER_EMOJI[group - 1]
+        
+        name, wind_dir_name, condition_esc, sources_str = cls.escape_many(
+            location.name,
+            wind_dir_name,
+            condition,
+            ", ".join(sources) if sources else "—",
+        )
+        
+        return _CUR_WEATHER_TPL.format_map({
+            "emoji": weather_emoji,
+            "name": name,
+            "temp": _fmt_num(temp),
+            "feels": _fmt_num(feels_like),
+            "wind": _fmt_num(wind_speed),
+            "wind_dir_name": wind_dir_name,
+            "gust_line": (
+                f"\n🌬 *Порывы:* {_fmt_num(wind_gust)} м/с"
+                if wind_gust is not None else ""
+            ),
+            "humidity": _opt_int(humidity),
+            "dew_point": _fmt_num(dew_point),
+            "dew_spread": _fmt_num(dew_spread),
+            "cloud_base": _opt_int(cloud_base_m),
+            "fog": _opt_int(fog_probability),
+            "visibility": _fmt_num(visibility),
+            "pressure": _opt_int(pressure),
+            "condition_line": f"\n\n📋 *Условия:* {condition_esc}" if condition else "",
+            "sources": sources_str,
+            "updated_at": updated_at,
+        })
     
     # Example bot-level TOML (API keys, timezone, polling — stored in DB)
     EXAMPLE_BOT_CONFIG = """# Подключения API и настройки бота (TOML в БД)
@@ -488,6 +680,7 @@ dew_point_spread_min = 2
 required_conditions_duration_hours = 4
 precipitation_probability_max = 20
 """
+    EXAMPLE_CONFIG_ESCAPED = _escape_md2(EXAMPLE_CONFIG)
     
     # Wind directions compass ASCII art (pre-escaped for MarkdownV2)
     WIND_COMPASS = """```
@@ -504,9 +697,20 @@ precipitation_probability_max = 20
         Ю \\(180°\\)
 ```"""
     
+    # Help texts depend only on the constants above; built once on first use
+    _HELP_CACHE: Optional[str] = None
+    _HELP_HTML_CACHE: Optional[str] = None
+    
     @classmethod
     def format_help_message(cls) -> str:
         """Format the help message."""
+        if cls._HELP_CACHE is None:
+            cls._HELP_CACHE = cls._build_help_message()
+        return cls._HELP_CACHE
+    
+    @classmethod
+    def _build_help_message(cls) -> str:
+        """Build the MarkdownV2 help message."""
         return f"""🪂 *Бот мониторинга погоды для парапланеристов*
 
 *Как это работает:*
@@ -524,7 +728,7 @@ _Настройки бота \\(API, таймзона, интервал\\) хр
 *Пример конфигурации локаций \\(TOML, /set\\_config\\_locations\\):*
 
 ```toml
-{cls.escape_markdown(cls.EXAMPLE_CONFIG)}
+{cls.EXAMPLE_CONFIG_ESCAPED}
 ```
 
 _Данные от OpenWeather и VisualCrossing_
@@ -575,6 +779,13 @@ _Данные от OpenWeather и VisualCrossing_
     @classmethod
     def format_help_message_html(cls) -> str:
         """Format the help message using HTML (avoids MarkdownV2 underscore/italic issues)."""
+        if cls._HELP_HTML_CACHE is None:
+            cls._HELP_HTML_CACHE = cls._build_help_message_html()
+        return cls._HELP_HTML_CACHE
+    
+    @classmethod
+    def _build_help_message_html(cls) -> str:
+        """Build the HTML help message."""
         example_escaped = cls.escape_html(cls.EXAMPLE_CONFIG)
         example_bot_escaped = cls.escape_html(cls.EXAMPLE_BOT_CONFIG)
         compass_raw = cls.WIND_COMPASS.strip()
@@ -652,6 +863,7 @@ ___________________________
 /set_config_bot — Изменить настройки бота (API, таймзона; только админы)"""
 
     @classmethod
+    @lru_cache(maxsize=256)
     def format_welcome_message(cls, user_name: str) -> str:
         """Format the welcome message."""
         return f"""👋 *Привет, {cls.escape_markdown(user_name)}\\!*
@@ -673,7 +885,7 @@ _Используйте /set\\_config\\_locations для настройки ло
         location: Location,
         new_windows: List,  # List of FlyableWindowInfo
         total_windows: int,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format notification about new flyable windows.
@@ -687,32 +899,26 @@ _Используйте /set\\_config\\_locations для настройки ло
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         
         # Build windows list
+        esc = cls.escape_markdown
         windows_text = []
         for window in new_windows[:7]:  # Limit to 7 windows
-            date_display = window.date
-            try:
-                dt = datetime.strptime(window.date, "%Y-%m-%d")
-                days_ru = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-                day_name = days_ru[dt.weekday()]
-                date_display = f"{day_name}, {dt.strftime('%d.%m')}"
-            except:
-                pass
-            source_label = cls._source_label(getattr(window, "source", "both"))
+            date_display = _fmt_window_date(window.date)
+            source_label = _escaped_source_label(window.source)
             windows_text.append(
-                f"📅 *{cls.escape_markdown(date_display)}*: "
+                f"📅 *{esc(date_display)}*: "
                 f"{window.start_hour:02d}:00 \\- {window.end_hour:02d}:00 "
-                f"\\({window.duration_hours}ч\\) \\({cls.escape_markdown(source_label)}\\)"
+                f"\\({window.duration_hours}ч\\) \\({source_label}\\)"
             )
             
             # Add weather summary
             if window.avg_temp is not None:
                 windows_text.append(
-                    f"   🌡 {cls.escape_markdown(f'{window.avg_temp:.0f}')}°C, "
-                    f"💨 {cls.escape_markdown(f'{window.avg_wind_speed:.1f}')} м/с, "
-                    f"💧 {cls.escape_markdown(f'{window.avg_humidity:.0f}')}%"
+                    f"   🌡 {_fmt_num(window.avg_temp, '.0f')}°C, "
+                    f"💨 {_fmt_num(window.avg_wind_speed)} м/с, "
+                    f"💧 {_fmt_num(window.avg_humidity, '.0f')}%"
                 )
         
         if len(new_windows) > 7:
@@ -722,21 +928,21 @@ _Используйте /set\\_config\\_locations для настройки ло
         
         return f"""✅🪂 *ЛЁТНАЯ ПОГОДА\\!*
 
-📍 *Локация:* {cls.escape_markdown(location.name)}
+📍 *Локация:* {_escaped_name(location.name)}
 
 *Новые лётные окна:*
 {windows_str}
 
 _Всего окон в прогнозе: {total_windows}_
 _По одному или обоим источникам_
-_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
+_Обновлено: {updated_at}_"""
     
     @classmethod
     def format_window_cancelled_message(
         cls,
         location: Location,
         window: FlyableWindow,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format notification about cancelled flyable window.
@@ -749,21 +955,13 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         
-        # Format date
-        date_display = window.date
-        try:
-            dt = datetime.strptime(window.date, "%Y-%m-%d")
-            days_ru = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-            day_name = days_ru[dt.weekday()]
-            date_display = f"{day_name}, {dt.strftime('%d.%m')}"
-        except:
-            pass
+        date_display = _fmt_window_date(window.date)
         
         return f"""❌🌧️ *ОКНО ОТМЕНЕНО*
 
-📍 *Локация:* {cls.escape_markdown(location.name)}
+📍 *Локация:* {_escaped_name(location.name)}
 
 *Отменённое окно:*
 📅 {cls.escape_markdown(date_display)}
@@ -771,7 +969,7 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
 
 _Погодные условия изменились\\._
 _Проверяйте обновления\\._
-_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
+_Обновлено: {updated_at}_"""
     
     @classmethod
     def format_windows_update_message(
@@ -780,7 +978,7 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         new_windows: List,
         cancelled_windows: List,
         total_windows: int,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format one message with new flyable windows and/or cancelled windows.
@@ -795,31 +993,25 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         parts = []
         
         # New flyable windows section
         if new_windows:
             new_lines = []
             for window in new_windows[:7]:
-                date_display = window.date
-                try:
-                    dt = datetime.strptime(window.date, "%Y-%m-%d")
-                    days_ru = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-                    date_display = f"{days_ru[dt.weekday()]}, {dt.strftime('%d.%m')}"
-                except Exception:
-                    pass
-                source_label = cls._source_label(getattr(window, "source", "both"))
+                date_display = _fmt_window_date(window.date)
+                source_label = _escaped_source_label(window.source)
                 new_lines.append(
                     f"📅 *{cls.escape_markdown(date_display)}*: "
                     f"{window.start_hour:02d}:00 \\- {window.end_hour:02d}:00 "
-                    f"\\({window.duration_hours}ч\\) \\({cls.escape_markdown(source_label)}\\)"
+                    f"\\({window.duration_hours}ч\\) \\({source_label}\\)"
                 )
                 if window.avg_temp is not None:
                     new_lines.append(
-                        f"   🌡 {cls.escape_markdown(f'{window.avg_temp:.0f}')}°C, "
-                        f"💨 {cls.escape_markdown(f'{window.avg_wind_speed:.1f}')} м/с, "
-                        f"💧 {cls.escape_markdown(f'{window.avg_humidity:.0f}')}%"
+                        f"   🌡 {_fmt_num(window.avg_temp, '.0f')}°C, "
+                        f"💨 {_fmt_num(window.avg_wind_speed)} м/с, "
+                        f"💧 {_fmt_num(window.avg_humidity, '.0f')}%"
                     )
             if len(new_windows) > 7:
                 new_lines.append(f"   _\\.\\.\\.и ещё {len(new_windows) - 7} окон_")
@@ -831,13 +1023,7 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         if cancelled_windows:
             cancelled_text = []
             for window in cancelled_windows[:7]:
-                date_display = window.date
-                try:
-                    dt = datetime.strptime(window.date, "%Y-%m-%d")
-                    days_ru = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-                    date_display = f"{days_ru[dt.weekday()]}, {dt.strftime('%d.%m')}"
-                except Exception:
-                    pass
+                date_display = _fmt_window_date(window.date)
                 cancelled_text.append(
                     f"📅 {cls.escape_markdown(date_display)}: "
                     f"{window.start_hour:02d}:00 \\- {window.end_hour:02d}:00 \\({window.duration_hours}ч\\)"
@@ -852,19 +1038,19 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
             return ""
         
         body = "\n\n".join(parts)
-        return f"""🪂 *Обновление: {cls.escape_markdown(location.name)}*
+        return f"""🪂 *Обновление: {_escaped_name(location.name)}*
 
 {body}
 
 _Всего окон в прогнозе: {total_windows}_
-_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
+_Обновлено: {updated_at}_"""
     
     @classmethod
     def format_forecast_status_message(
         cls,
         result,  # FullForecastAnalysis
         location: Location,
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format a full forecast status message.
@@ -877,7 +1063,7 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         
         status_emoji = "✅🪂" if result.has_flyable_conditions else "❌"
         status_text = "ЕСТЬ ЛЁТНЫЕ ОКНА" if result.has_flyable_conditions else "НЕТ ЛЁТНЫХ ОКОН"
@@ -890,75 +1076,71 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         except:
             period = "—"
         
-        message = f"""{status_emoji} *Прогноз: {cls.escape_markdown(status_text)}*
+        parts = [f"""{status_emoji} *Прогноз: {cls.escape_markdown(status_text)}*
 
-📍 *Локация:* {cls.escape_markdown(result.location_name)}
+📍 *Локация:* {_escaped_name(result.location_name)}
 📅 *Период:* {cls.escape_markdown(period)}
 📊 *Проанализировано:* {result.total_hours_analyzed} часов
 ✈️ *Лётных часов:* {result.total_flyable_hours}
 
-"""
+"""]
+        add = parts.append
         
         if result.flyable_windows:
-            message += "*Лётные окна:*\n"
+            add("*Лётные окна:*\n")
             
+            esc = cls.escape_markdown
             for window in result.flyable_windows[:10]:  # Limit to 10
-                date_display = window.date
-                try:
-                    dt = datetime.strptime(window.date, "%Y-%m-%d")
-                    days_ru = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-                    day_name = days_ru[dt.weekday()]
-                    date_display = f"{day_name}, {dt.strftime('%d.%m')}"
-                except:
-                    pass
-                
-                source_label = cls._source_label(getattr(window, "source", "both"))
-                message += f"📅 *{cls.escape_markdown(date_display)}*: "
-                message += f"{window.start_hour:02d}:00 \\- {window.end_hour:02d}:00 "
-                message += f"\\({window.duration_hours}ч\\) \\({cls.escape_markdown(source_label)}\\)\n"
+                date_display = _fmt_window_date(window.date)
+                source_label = _escaped_source_label(window.source)
+                add(f"📅 *{esc(date_display)}*: ")
+                add(f"{window.start_hour:02d}:00 \\- {window.end_hour:02d}:00 ")
+                add(f"\\({window.duration_hours}ч\\) \\({source_label}\\)\n")
                 
                 if window.avg_temp is not None:
-                    message += f"   🌡 {cls.escape_markdown(f'{window.avg_temp:.0f}')}°C, "
-                    message += f"💨 {cls.escape_markdown(f'{window.avg_wind_speed:.1f}')} м/с"
-                    cb = getattr(window, "avg_cloud_base_m", None)
-                    fp = getattr(window, "max_fog_probability", None)
+                    add(f"   🌡 {_fmt_num(window.avg_temp, '.0f')}°C, ")
+                    add(f"💨 {_fmt_num(window.avg_wind_speed)} м/с")
+                    cb = window.avg_cloud_base_m
+                    fp = window.max_fog_probability
                     if cb is not None or fp is not None:
-                        message += f", ☁️ {cls.escape_markdown(str(int(cb)) if cb is not None else '—')} м"
-                        message += f", 🌫 {cls.escape_markdown(str(int(fp)) if fp is not None else '—')}%"
-                    message += "\n"
+                        add(f", ☁️ {_opt_int(cb)} м")
+                        add(f", 🌫 {_opt_int(fp)}%")
+                    add("\n")
             
             if len(result.flyable_windows) > 10:
-                message += f"_\\.\\.\\.и ещё {len(result.flyable_windows) - 10} окон_\n"
+                add(f"_\\.\\.\\.и ещё {len(result.flyable_windows) - 10} окон_\n")
         else:
-            message += "*Причины:*\n"
+            add("*Причины:*\n")
             for reason in result.rejection_reasons[:5]:
-                message += f"• {cls.escape_markdown(reason)}\n"
+                add(f"• {cls.escape_markdown(reason)}\n")
         
         # Current conditions
-        if result.current_temp is not None:
-            wind_dir_name = cls._get_wind_direction_name(result.current_wind_direction or 0)
-            message += f"\n*Текущая погода:*\n"
-            message += f"🌡 {cls.escape_markdown(f'{result.current_temp:.1f}')}°C, "
-            message += f"💨 {cls.escape_markdown(f'{result.current_wind_speed:.1f}' if result.current_wind_speed else '—')} м/с {cls.escape_markdown(wind_dir_name)}, "
-            message += f"💧 {cls.escape_markdown(str(int(result.current_humidity or 0)))}%\n"
+        ct = result.current_temp
+        if ct is not None:
+            cws = result.current_wind_speed
             cb = result.current_cloud_base_m
             fp = result.current_fog_probability
+            wind_dir_name = cls._get_wind_direction_name(result.current_wind_direction or 0)
+            add("\n*Текущая погода:*\n")
+            add(f"🌡 {_fmt_num(ct)}°C, ")
+            add(f"💨 {_fmt_num(cws or None)} м/с {cls.escape_markdown(wind_dir_name)}, ")
+            add(f"💧 {_opt_int(result.current_humidity or 0)}%\n")
             if cb is not None or fp is not None:
-                message += f"☁️ Высота облаков: {cls.escape_markdown(str(int(cb)) if cb is not None else '—')} м, "
-                message += f"🌫 Туман: {cls.escape_markdown(str(int(fp)) if fp is not None else '—')}%\n"
+                add(f"☁️ Высота облаков: {_opt_int(cb)} м, ")
+                add(f"🌫 Туман: {_opt_int(fp)}%\n")
         
-        message += f"""
+        add(f"""
 _OpenWeather: {'✅' if result.openweather_available else '❌'} \\({result.openweather_hours}ч\\) \\| VisualCrossing: {'✅' if result.visualcrossing_available else '❌'} \\({result.visualcrossing_hours}ч\\)_
-_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
+_Обновлено: {updated_at}_""")
         
-        return message
+        return "".join(parts)
     
     @classmethod
     def format_combined_status_message(
         cls,
         locations_results: List,  # List of (Location, FullForecastAnalysis)
         errors: List,  # List of (location_name: str, error: str)
-        timezone: pytz.timezone = pytz.UTC
+        timezone: tzinfo = UTC
     ) -> str:
         """
         Format one status message for all locations.
@@ -971,7 +1153,7 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         Returns:
             Formatted MarkdownV2 message
         """
-        now = datetime.now(timezone)
+        updated_at = _updated_at(timezone)
         parts = ["📊 *СТАТУС ПО ЛОКАЦИЯМ*"]
         # Период поиска подходящей погоды — берём из первого результата
         if locations_results:
@@ -986,17 +1168,11 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
         parts[0] += "\n"
         for location, result in locations_results:
             status_emoji = "✅🪂" if result.has_flyable_conditions else "❌"
-            loc_block = f"{status_emoji} *{cls.escape_markdown(location.name)}*"
+            loc_block = f"{status_emoji} *{_escaped_name(location.name)}*"
             if result.flyable_windows:
                 loc_block += f" — {len(result.flyable_windows)} окон"
                 first = result.flyable_windows[0]
-                date_display = first.date
-                try:
-                    dt = datetime.strptime(first.date, "%Y-%m-%d")
-                    days_ru = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-                    date_display = f"{days_ru[dt.weekday()]}, {dt.strftime('%d.%m')}"
-                except Exception:
-                    pass
+                date_display = _fmt_window_date(first.date)
                 loc_block += f"\n   📅 {cls.escape_markdown(date_display)} {first.start_hour:02d}:00 \\- {first.end_hour:02d}:00 \\({first.duration_hours}ч\\)"
                 if len(result.flyable_windows) > 1:
                     loc_block += f" _\\.\\.\\.\\+{len(result.flyable_windows) - 1}_"
@@ -1005,102 +1181,68 @@ _Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_"""
                     loc_block += f"\n   • {cls.escape_markdown(result.rejection_reasons[0][:60])}"
                     if len(result.rejection_reasons) > 1:
                         loc_block += " _\\.\\.\\._"
-            if result.current_temp is not None:
-                loc_block += f"\n   🌡 {cls.escape_markdown(f'{result.current_temp:.0f}')}°C, 💨 {cls.escape_markdown(f'{result.current_wind_speed:.1f}' if result.current_wind_speed else '—')} м/с"
+            ct, cws = result.current_temp, result.current_wind_speed
+            if ct is not None:
+                loc_block += f"\n   🌡 {_fmt_num(ct, '.0f')}°C, 💨 {_fmt_num(cws or None)} м/с"
             parts.append(loc_block)
         
         for loc_name, err in errors:
             parts.append(f"❌ *{cls.escape_markdown(loc_name)}*: {cls.escape_markdown(str(err)[:80])}")
         
-        parts.append(f"\n_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_")
+        parts.append(f"\n_Обновлено: {updated_at}_")
         return "\n\n".join(parts)
     
     @staticmethod
     def _get_wind_direction_name(degrees: int) -> str:
         """Convert wind direction in degrees to compass name."""
-        directions = [
-            "С", "ССВ", "СВ", "ВСВ",
-            "В", "ВЮВ", "ЮВ", "ЮЮВ",
-            "Ю", "ЮЮЗ", "ЮЗ", "ЗЮЗ",
-            "З", "ЗСЗ", "СЗ", "ССЗ"
-        ]
-        idx = round(degrees / 22.5) % 16
-        return directions[idx]
+        return wind_direction_name(degrees)
 
     @staticmethod
     def _source_label(source: str) -> str:
         """Human-readable label for forecast source."""
-        labels = {
-            "both": "Оба",
-            "openweather": "OpenWeather",
-            "visualcrossing": "VisualCrossing",
-            "mixed": "Оба источника",
-        }
-        return labels.get((source or "both").lower(), source) if isinstance(source, str) else "—"
+        return _source_label(source)
 
     @classmethod
     def format_flywindow_message(
         cls,
         locations_with_results: list,
-        timezone: "pytz.timezone",
+        timezone: tzinfo,
     ) -> str:
         """
         Format all flyable windows for /flywindow with full weather details.
         locations_with_results: list of (Location, FullForecastAnalysis) where result has flyable_windows.
         """
-        from datetime import datetime
-
         if not locations_with_results:
             return "🪂 *Лётные окна*\n\nНет подходящих лётных окон в прогнозе\\."
 
-        lines = ["🪂 *Лётные окна*", ""]
-        now = datetime.now(timezone)
+        buf = io.StringIO()
+        write = buf.write
+        write("🪂 *Лётные окна*\n\n")
+        updated_at = _updated_at(timezone)
 
         for location, result in locations_with_results:
-            loc_name = cls.escape_markdown(location.name)
-            lines.append(f"📍 *{loc_name}*")
-            lines.append("")
+            write(f"📍 *{_escaped_name(location.name)}*\n\n")
 
             for w in result.flyable_windows:
-                date_display = w.date
-                try:
-                    dt = datetime.strptime(w.date, "%Y-%m-%d")
-                    days_ru = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-                    day_name = days_ru[dt.weekday()]
-                    date_display = f"{day_name}, {dt.strftime('%d.%m.%Y')}"
-                except Exception:
-                    pass
-                date_display = cls.escape_markdown(date_display)
-                source_label = cls._source_label(getattr(w, "source", "both"))
-                source_label = cls.escape_markdown(source_label)
-
-                lines.append(f"📅 *{date_display}*")
-                lines.append(
-                    f"   ⏰ {w.start_hour:02d}:00 \\- {w.end_hour:02d}:00 \\({w.duration_hours} ч\\) \\({source_label}\\)"
-                )
-                lines.append(
-                    f"   🌡 Температура: {cls.escape_markdown(f'{w.avg_temp:.1f}')}°C \\(мин\\. {cls.escape_markdown(f'{w.min_temp:.0f}')} \\- макс\\. {cls.escape_markdown(f'{w.max_temp:.0f}')}°C\\)"
-                )
-                lines.append(
-                    f"   💨 Ветер: ср\\. {cls.escape_markdown(f'{w.avg_wind_speed:.1f}')} м/с, макс\\. {cls.escape_markdown(f'{w.max_wind_speed:.1f}')} м/с"
-                )
-                lines.append(
-                    f"   💧 Влажность: ср\\. {cls.escape_markdown(f'{w.avg_humidity:.0f}')}%"
-                )
-                lines.append(
-                    f"   🌧 Вероятность осадков: макс\\. {cls.escape_markdown(f'{w.max_precipitation_prob:.0f}')}%"
-                )
-                cb = getattr(w, "avg_cloud_base_m", None)
-                fp = getattr(w, "max_fog_probability", None)
-                lines.append(
-                    f"   ☁️ Высота облаков: {cls.escape_markdown(str(int(cb)) if cb is not None else '—')} м"
-                )
-                lines.append(
-                    f"   🌫 Вероятность тумана: {cls.escape_markdown(str(int(fp)) if fp is not None else '—')}%"
-                )
-                lines.append("")
-
-            lines.append("")
-
-        lines.append(f"_Обновлено: {cls.escape_markdown(now.strftime('%H:%M %d.%m.%Y'))}_")
-        return "\n".join(lines)
+                write(_FLYWINDOW_ROW.format(
+                    date=cls.escape_markdown(_fmt_window_date(w.date, True)),
+                    sh=w.start_hour,
+                    eh=w.end_hour,
+                    dur=w.duration_hours,
+                    src=_escaped_source_label(w.source),
+                    avg_t=_fmt_num(w.avg_temp),
+                    min_t=_fmt_num(w.min_temp, ".0f"),
+                    max_t=_fmt_num(w.max_temp, ".0f"),
+                    avg_w=_fmt_num(w.avg_wind_speed),
+                    max_w=_fmt_num(w.max_wind_speed),
+                    hum=_fmt_num(w.avg_humidity, ".0f"),
+                    prc=_fmt_num(w.max_precipitation_prob, ".0f"),
+                    cb=_opt_int(w.avg_cloud_base_m),
+                    fp=_opt_int(w.max_fog_probability),
+                ))
+                write("\n")
+
+            write("\n")
+
+        write(f"_Обновлено: {updated_at}_")
+        return buf.getvalue()
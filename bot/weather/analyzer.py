@@ -4,18 +4,19 @@ Combines data from multiple sources and evaluates against location-specific rule
 """
 
 import logging
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
-from collections import defaultdict
-import pytz
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime, timedelta, tzinfo
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
 
 from ..database.models import Location
+from .compass import wind_direction_name
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class HourlyWeather:
     """Standardized hourly weather data from any source."""
     datetime: datetime
@@ -43,7 +44,7 @@ class HourlyWeather:
     source: str = ""  # Which API this came from
 
 
-@dataclass
+@dataclass(slots=True)
 class ConditionCheck:
     """Result of checking a single condition."""
     name: str
@@ -53,7 +54,161 @@ class ConditionCheck:
     message: str
 
 
-@dataclass
+def _parse_forecast_datetime(dt_str: str) -> datetime:
+    """
+    Parse a forecast timestamp: "YYYY-MM-DD HH:MM:SS[.fff]" or "YYYY-MM-DD".
+    
+    The fixed-width forms both APIs emit are sliced directly; anything else
+    goes through strptime, so malformed input still raises ValueError.
+    """
+    if " " in dt_str:
+        s = dt_str.split(".")[0]
+        if (
+            len(s) == 19 and s.isascii()
+            and s[4] == "-" and s[7] == "-" and s[10] == " " and s[13] == ":" and s[16] == ":"
+            and (s[0:4] + s[5:7] + s[8:10] + s[11:13] + s[14:16] + s[17:19]).isdigit()
+        ):
+            return datetime(
+                int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                int(s[11:13]), int(s[14:16]), int(s[17:19])
+            )
+        return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
+    if (
+        len(dt_str) == 10 and dt_str.isascii()
+        and dt_str[4] == "-" and dt_str[7] == "-"
+        and (dt_str[0:4] + dt_str[5:7] + dt_str[8:10]).isdigit()
+    ):
+        return datetime(int(dt_str[0:4]), int(dt_str[5:7]), int(dt_str[8:10]))
+    return datetime.strptime(dt_str, "%Y-%m-%d")
+
+
+def _direction_within(actual: int, allowed: Tuple[int, ...], tolerance: int) -> bool:
+    """Check if a wind direction is within tolerance of any allowed direction."""
+    for allowed_dir in allowed:
+        # Signed angular difference folded into [-180, 180)
+        if abs((actual - allowed_dir + 180) % 360 - 180) <= tolerance:
+            return True
+    return False
+
+
+@lru_cache(maxsize=64)
+def _build_wind_dir_lut(allowed: Tuple[int, ...], tolerance: int) -> bytes:
+    """
+    Precompute the wind-direction check for every whole degree 0-359.
+    
+    Memoized: locations rarely change their allowed directions.
+    
+    Returns:
+        360 bytes; entry d is 1 if direction d is within tolerance of any allowed direction
+    """
+    return bytes(_direction_within(d, allowed, tolerance) for d in range(360))
+
+
+# Window source label by (has OpenWeather-only hours, has VisualCrossing-only hours)
+_WINDOW_SOURCES = {
+    (False, False): "both",
+    (True, False): "openweather",
+    (False, True): "visualcrossing",
+    (True, True): "mixed",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class HourLimits:
+    """
+    A location's per-hour thresholds, read once per analysis.
+    
+    Checking an hour against these avoids re-reading every Location field
+    (and re-parsing the wind-direction JSON) for each hour of each source.
+    """
+    temp_min: float
+    humidity_max: float
+    wind_speed_max: float
+    wind_gust_max: float
+    allowed_directions: Tuple[int, ...]
+    wind_direction_tolerance: int
+    dew_point_spread_min: float
+    precipitation_probability_max: float
+    wind_direction_lut: bytes = b""
+    
+    @classmethod
+    def from_location(cls, location: Location) -> "HourLimits":
+        """Snapshot the thresholds of a location."""
+        allowed = tuple(location.get_wind_directions_list() or ())
+        tolerance = location.wind_direction_tolerance
+        return cls(
+            temp_min=location.temp_min,
+            humidity_max=location.humidity_max,
+            wind_speed_max=location.wind_speed_max,
+            wind_gust_max=location.wind_gust_max,
+            allowed_directions=allowed,
+            wind_direction_tolerance=tolerance,
+            dew_point_spread_min=location.dew_point_spread_min,
+            precipitation_probability_max=location.precipitation_probability_max,
+            wind_direction_lut=_build_wind_dir_lut(allowed, tolerance) if allowed else b"",
+        )
+
+
+@lru_cache(maxsize=64)
+def _compile_hour_check(limits: HourLimits) -> Callable[[HourlyWeather], bool]:
+    """
+    Specialize the per-hour flyability check to one set of thresholds.
+    
+    The thresholds become closure variables, so checking an hour does no
+    attribute lookups on the limits. Memoized per HourLimits snapshot.
+    
+    Cheap comparisons that reject most hours (wind, precipitation,
+    humidity) run first; the dew point arithmetic and the wind direction
+    lookup only run for hours that pass them.
+    """
+    wind_speed_max = limits.wind_speed_max
+    precipitation_probability_max = limits.precipitation_probability_max
+    wind_gust_max = limits.wind_gust_max
+    humidity_max = limits.humidity_max
+    temp_min = limits.temp_min
+    dew_point_spread_min = limits.dew_point_spread_min
+    allowed_directions = limits.allowed_directions
+    tolerance = limits.wind_direction_tolerance
+    direction_lut = limits.wind_direction_lut
+    
+    def check(weather: HourlyWeather) -> bool:
+        # Wind speed
+        if weather.wind_speed > wind_speed_max:
+            return False
+        
+        # Precipitation probability
+        if weather.precipitation_probability > precipitation_probability_max:
+            return False
+        
+        # Wind gust
+        if weather.wind_gust > wind_gust_max:
+            return False
+        
+        # Humidity
+        if weather.humidity > humidity_max:
+            return False
+        
+        # Temperature (minimum only; no upper limit)
+        if weather.temperature < temp_min:
+            return False
+        
+        # Dew point spread
+        if weather.temperature - weather.dew_point < dew_point_spread_min:
+            return False
+        
+        # Wind direction (table lookup for whole degrees, full check otherwise)
+        if allowed_directions:
+            direction = weather.wind_direction
+            if 0 <= direction < 360:
+                return direction_lut[direction] == 1
+            return _direction_within(direction, allowed_directions, tolerance)
+        
+        return True
+    
+    return check
+
+
+@dataclass(slots=True)
 class FlyableWindowInfo:
     """Information about a single flyable window."""
     date: str  # YYYY-MM-DD
@@ -99,7 +254,7 @@ class FlyableWindowInfo:
         return f"{self.date} {self.start_hour:02d}:00-{self.end_hour:02d}:00 ({self.duration_hours}ч)"
 
 
-@dataclass
+@dataclass(slots=True)
 class FullForecastAnalysis:
     """Complete analysis result for a location across the entire forecast period."""
     location_id: int
@@ -157,7 +312,10 @@ class WeatherAnalyzer:
     - Returns multiple flyable windows if they exist
     """
     
-    def __init__(self, timezone: pytz.timezone = pytz.UTC):
+    # Number of recent analyses kept for re-checks with unchanged forecasts
+    RESULT_CACHE_SIZE = 64
+    
+    def __init__(self, timezone: tzinfo = UTC):
         """
         Initialize the weather analyzer.
         
@@ -165,6 +323,31 @@ class WeatherAnalyzer:
             timezone: Timezone for interpreting time windows
         """
         self.timezone = timezone
+        self._result_cache: "OrderedDict[tuple, FullForecastAnalysis]" = OrderedDict()
+    
+    @staticmethod
+    def _payload_key(data: Dict[str, Any]) -> Optional[Tuple[Any, str]]:
+        """
+        Identify the fetch a parsed API payload came from.
+        
+        The weather clients stamp every parsed response with fetched_at, so
+        (source, fetched_at) only repeats when a client hands back its cached
+        response. Payloads without the stamp are not cached.
+        """
+        fetched_at = data.get("fetched_at")
+        if not fetched_at:
+            return None
+        return data.get("source"), fetched_at
+    
+    @staticmethod
+    def _copy_result(result: FullForecastAnalysis, now: datetime) -> FullForecastAnalysis:
+        """Copy an analysis with fresh lists, stamped with a new analysis time."""
+        return replace(
+            result,
+            analysis_time=now,
+            flyable_windows=list(result.flyable_windows),
+            rejection_reasons=list(result.rejection_reasons),
+        )
     
     def analyze_full_forecast(
         self,
@@ -184,6 +367,7 @@ class WeatherAnalyzer:
             FullForecastAnalysis with all found flyable windows
         """
         now = datetime.now(self.timezone)
+        today_str = now.date().isoformat()
         
         result = FullForecastAnalysis(
             location_id=location.id,
@@ -203,69 +387,73 @@ class WeatherAnalyzer:
                 result.rejection_reasons.append("❌ Нет данных от VisualCrossing")
             return result
         
-        # Parse all hourly data from both sources
-        ow_hourly = self._parse_all_hourly_data(openweather_data, "openweather")
-        vc_hourly = self._parse_all_hourly_data(visualcrossing_data, "visualcrossing")
-        
-        result.openweather_hours = len(ow_hourly)
-        result.visualcrossing_hours = len(vc_hourly)
+        limits = HourLimits.from_location(location)
+        
+        # Same rules, same fetches and same current hour give the same result
+        ow_key = self._payload_key(openweather_data)
+        vc_key = self._payload_key(visualcrossing_data)
+        cache_key = None
+        if ow_key is not None and vc_key is not None:
+            cache_key = (
+                location.id,
+                location.name,
+                location.time_window_start,
+                location.time_window_end,
+                location.required_conditions_duration_hours,
+                limits,
+                today_str,
+                now.hour,
+                ow_key,
+                vc_key,
+            )
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                return self._copy_result(cached, now)
+        
+        # Parse all hourly data from both sources, indexed by date, then hour
+        ow_by_date, result.openweather_hours = self._parse_hourly_by_date(
+            openweather_data, "openweather"
+        )
+        vc_by_date, result.visualcrossing_hours = self._parse_hourly_by_date(
+            visualcrossing_data, "visualcrossing"
+        )
         
-        if not ow_hourly or not vc_hourly:
+        if not result.openweather_hours or not result.visualcrossing_hours:
             result.rejection_reasons.append("❌ Нет почасовых данных в прогнозах")
             return result
         
-        # Group hourly data by date
-        ow_by_date = self._group_by_date(ow_hourly)
-        vc_by_date = self._group_by_date(vc_hourly)
-        
         # Get all dates present in both sources
-        all_dates = sorted(set(ow_by_date.keys()) & set(vc_by_date.keys()))
+        all_dates = [d for d in ow_by_date if d in vc_by_date]
+        all_dates.sort()  # ISO dates sort chronologically
         
         if not all_dates:
             result.rejection_reasons.append("❌ Нет совпадающих дат в прогнозах")
             return result
         
         # Update forecast horizon
-        result.forecast_start = datetime.strptime(all_dates[0], "%Y-%m-%d")
-        result.forecast_start = self.timezone.localize(result.forecast_start)
-        result.forecast_end = datetime.strptime(all_dates[-1], "%Y-%m-%d")
-        result.forecast_end = self.timezone.localize(result.forecast_end)
+        zone = self.timezone
+        result.forecast_start = datetime.fromisoformat(all_dates[0]).replace(tzinfo=zone)
+        result.forecast_end = datetime.fromisoformat(all_dates[-1]).replace(tzinfo=zone)
+        
+        check = _compile_hour_check(limits)
         
         # Analyze each date: union of flyable hours from all sources → max continuous windows
         all_flyable_windows = []
         total_hours = 0
         
         for date_str in all_dates:
-            ow_day_data = ow_by_date.get(date_str, [])
-            vc_day_data = vc_by_date.get(date_str, [])
-            
-            hours_both, hours_ow_only, hours_vc_only = self._find_flyable_hours_for_day(
-                location, ow_day_data, vc_day_data
+            day_windows, day_hours = self._scan_day(
+                date_str, location, check, ow_by_date[date_str], vc_by_date[date_str]
             )
-            # Union: любой источник считает час лётным → включаем в окно (максимум часов)
-            hours_union = sorted(set(hours_both) | set(hours_ow_only) | set(hours_vc_only))
-            total_hours += len(hours_union)
-            
-            req = location.required_conditions_duration_hours
-            combined_hourly = ow_day_data + vc_day_data
-            
-            # Окна по объединённым часам — максимальная непрерывная длина
-            raw_windows = self._find_continuous_windows(
-                date_str, hours_union, req, combined_hourly, source="both"
-            )
-            # Для каждого окна определяем источник по входящим часам
-            for w in raw_windows:
-                window_hours = set(range(w.start_hour, w.end_hour + 1))
-                w.source = self._window_source(
-                    window_hours, set(hours_both), set(hours_ow_only), set(hours_vc_only)
-                )
-            all_flyable_windows.extend(raw_windows)
+            total_hours += day_hours
+            all_flyable_windows.extend(day_windows)
         
         # Sort by date, then start_hour
         all_flyable_windows.sort(key=lambda w: (w.date, w.start_hour))
         result.flyable_windows = all_flyable_windows
         result.total_flyable_hours = total_hours
-        result.total_hours_analyzed = sum(len(ow_by_date.get(d, [])) for d in all_dates)
+        result.total_hours_analyzed = sum(len(ow_by_date[d]) for d in all_dates)
         result.has_flyable_conditions = len(all_flyable_windows) > 0
         
         # If no flyable windows found, add rejection reasons
@@ -279,47 +467,61 @@ class WeatherAnalyzer:
                 )
         
         # Set current conditions from nearest hour
-        self._set_current_conditions(result, ow_hourly, vc_hourly)
+        self._set_current_conditions(
+            result, ow_by_date.get(today_str, {}), vc_by_date.get(today_str, {}), now.hour
+        )
+        
+        if cache_key is not None:
+            # Keep a private copy so callers can't alter what later hits return
+            self._result_cache[cache_key] = self._copy_result(result, now)
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
         
         return result
     
-    def _parse_all_hourly_data(
+    def _parse_hourly_by_date(
         self, 
         data: Dict[str, Any], 
         source: str
-    ) -> List[HourlyWeather]:
-        """Parse ALL hourly data from API response, not filtered by date."""
-        hourly_list = []
+    ) -> Tuple[Dict[str, Dict[int, HourlyWeather]], int]:
+        """
+        Parse ALL hourly data from API response, not filtered by date.
+        
+        Hours go straight into a {date: {hour: HourlyWeather}} index as they
+        are parsed; a repeated (date, hour) keeps the last entry.
+        
+        Returns:
+            (index by date and hour, number of hours parsed)
+        """
+        by_date: Dict[str, Dict[int, HourlyWeather]] = {}
+        parsed = 0
+        zone = self.timezone
         
         for hour_data in data.get("hourly", []):
             # Parse datetime
             dt_str = hour_data.get("datetime", "")
             
             try:
-                if " " in dt_str:
-                    # Format: "YYYY-MM-DD HH:MM:SS"
-                    dt = datetime.strptime(dt_str.split(".")[0], "%Y-%m-%d %H:%M:%S")
-                else:
-                    # Format: "YYYY-MM-DD"
-                    dt = datetime.strptime(dt_str, "%Y-%m-%d")
+                dt = _parse_forecast_datetime(dt_str)
             except ValueError:
-                # Try parsing from timestamp
+                # Try parsing from timestamp, converting straight into the zone
                 timestamp = hour_data.get("timestamp", 0)
                 if timestamp:
-                    dt = datetime.fromtimestamp(timestamp)
+                    dt = datetime.fromtimestamp(timestamp, tz=zone)
                 else:
                     continue
             
             # Make timezone aware
             if dt.tzinfo is None:
-                dt = self.timezone.localize(dt)
+                dt = dt.replace(tzinfo=zone)
             
-            date_str = dt.strftime("%Y-%m-%d")
+            date_str = dt.date().isoformat()
+            hour = dt.hour
             
             hourly = HourlyWeather(
                 datetime=dt,
                 date_str=date_str,
-                hour=dt.hour,
+                hour=hour,
                 temperature=hour_data.get("temperature", 0),
                 feels_like=hour_data.get("feels_like", 0),
                 humidity=hour_data.get("humidity", 0),
@@ -340,173 +542,82 @@ class WeatherAnalyzer:
                 source=source
             )
             
-            hourly_list.append(hourly)
+            day = by_date.get(date_str)
+            if day is None:
+                day = by_date[date_str] = {}
+            day[hour] = hourly
+            parsed += 1
         
-        return hourly_list
+        return by_date, parsed
     
-    def _group_by_date(self, hourly_list: List[HourlyWeather]) -> Dict[str, List[HourlyWeather]]:
-        """Group hourly data by date."""
-        by_date = defaultdict(list)
-        for h in hourly_list:
-            by_date[h.date_str].append(h)
-        return dict(by_date)
-    
-    def _find_flyable_hours_for_day(
+    def _scan_day(
         self,
+        date_str: str,
         location: Location,
-        ow_day_data: List[HourlyWeather],
-        vc_day_data: List[HourlyWeather]
-    ) -> Tuple[List[int], List[int], List[int]]:
+        check: Callable[[HourlyWeather], bool],
+        ow_by_hour: Dict[int, HourlyWeather],
+        vc_by_hour: Dict[int, HourlyWeather]
+    ) -> Tuple[List[FlyableWindowInfo], int]:
         """
-        Find flyable hours for a single day per source.
-        Returns (hours_both, hours_ow_only, hours_vc_only).
-        """
-        ow_by_hour = {h.hour: h for h in ow_day_data}
-        vc_by_hour = {h.hour: h for h in vc_day_data}
-        start_hour = location.time_window_start
-        end_hour = location.time_window_end
-        
-        hours_both = []
-        hours_ow_only = []
-        hours_vc_only = []
-        
-        for hour in range(start_hour, end_hour + 1):
-            ow_hour = ow_by_hour.get(hour)
-            vc_hour = vc_by_hour.get(hour)
-            
-            ow_flyable = self._check_hour_flyable(ow_hour, location) if ow_hour else False
-            vc_flyable = self._check_hour_flyable(vc_hour, location) if vc_hour else False
-            
-            if ow_flyable and vc_flyable:
-                hours_both.append(hour)
-            elif ow_flyable:
-                hours_ow_only.append(hour)
-            elif vc_flyable:
-                hours_vc_only.append(hour)
-        
-        return (hours_both, hours_ow_only, hours_vc_only)
-    
-    def _check_hour_flyable(self, weather: HourlyWeather, location: Location) -> bool:
-        """Check if all conditions are met for a single hour."""
-        # Temperature (minimum only; no upper limit)
-        if weather.temperature < location.temp_min:
-            return False
-        
-        # Humidity
-        if weather.humidity > location.humidity_max:
-            return False
+        Find a day's flyable windows from per-source hour bitmasks.
         
-        # Wind speed
-        if weather.wind_speed > location.wind_speed_max:
-            return False
-        
-        # Wind gust
-        if weather.wind_gust > location.wind_gust_max:
-            return False
-        
-        # Wind direction
-        allowed_directions = location.get_wind_directions_list()
-        if allowed_directions:
-            if not self._check_wind_direction(
-                weather.wind_direction,
-                allowed_directions,
-                location.wind_direction_tolerance
-            ):
-                return False
-        
-        # Dew point spread
-        dew_spread = weather.temperature - weather.dew_point
-        if dew_spread < location.dew_point_spread_min:
-            return False
+        Union: любой источник считает час лётным → час входит в окно
+        (максимальная непрерывная длина). Each window is labelled by whether
+        its hours include OpenWeather-only or VisualCrossing-only bits.
         
-        # Precipitation probability
-        if weather.precipitation_probability > location.precipitation_probability_max:
-            return False
+        Returns:
+            (windows, number of flyable hours in the day)
+        """
+        required = location.required_conditions_duration_hours
         
-        return True
-    
-    def _check_wind_direction(
-        self, 
-        actual: int, 
-        allowed: List[int], 
-        tolerance: int
-    ) -> bool:
-        """Check if wind direction is within allowed directions."""
-        for allowed_dir in allowed:
-            diff = abs(actual - allowed_dir)
-            if diff > 180:
-                diff = 360 - diff
-            if diff <= tolerance:
-                return True
-        return False
-    
-    def _window_source(
-        self,
-        window_hours: set,
-        hours_both: set,
-        hours_ow_only: set,
-        hours_vc_only: set
-    ) -> str:
-        """Determine source label for a window: both, openweather, visualcrossing, or mixed."""
-        if not window_hours:
-            return "both"
-        in_both = bool(window_hours & hours_both)
-        in_ow = bool(window_hours & hours_ow_only) or in_both
-        in_vc = bool(window_hours & hours_vc_only) or in_both
-        if window_hours <= hours_both:
-            return "both"
-        if window_hours <= (hours_both | hours_ow_only) and not (window_hours & hours_vc_only):
-            return "openweather"
-        if window_hours <= (hours_both | hours_vc_only) and not (window_hours & hours_ow_only):
-            return "visualcrossing"
-        return "mixed"
-
-    def _find_continuous_windows(
-        self,
-        date_str: str,
-        flyable_hours: List[int],
-        required_hours: int,
-        all_hourly_data: List[HourlyWeather],
-        source: str = "both"
-    ) -> List[FlyableWindowInfo]:
-        """Find continuous windows of flyable hours and calculate statistics."""
-        if len(flyable_hours) < required_hours:
-            return []
+        start_hour = location.time_window_start
+        end_hour = location.time_window_end
         
-        sorted_hours = sorted(flyable_hours)
+        # Bit h of each mask is set when that source finds hour h flyable;
+        # walk the hours each source actually has (OpenWeather is 3-hourly)
+        ow_mask = vc_mask = 0
+        for hour, weather in ow_by_hour.items():
+            if start_hour <= hour <= end_hour and check(weather):
+                ow_mask |= 1 << hour
+        for hour, weather in vc_by_hour.items():
+            if start_hour <= hour <= end_hour and check(weather):
+                vc_mask |= 1 << hour
+        
+        union = ow_mask | vc_mask
+        flyable_count = union.bit_count()
         windows = []
         
-        current_sequence = [sorted_hours[0]]
-        for i in range(1, len(sorted_hours)):
-            if sorted_hours[i] == sorted_hours[i-1] + 1:
-                current_sequence.append(sorted_hours[i])
-            else:
-                if len(current_sequence) >= required_hours:
-                    window = self._create_window_info(
-                        date_str, current_sequence, all_hourly_data, source=source
-                    )
-                    windows.append(window)
-                current_sequence = [sorted_hours[i]]
-        
-        if len(current_sequence) >= required_hours:
-            window = self._create_window_info(
-                date_str, current_sequence, all_hourly_data, source=source
-            )
-            windows.append(window)
-        
-        return windows
+        # Peel off runs of consecutive set bits, lowest hour first
+        remaining = union
+        while remaining:
+            start = (remaining & -remaining).bit_length() - 1
+            shifted = remaining >> start
+            length = (~shifted & (shifted + 1)).bit_length() - 1
+            run_mask = ((1 << length) - 1) << start
+            remaining &= ~run_mask
+            if length >= required:
+                windows.append(self._create_window_info(
+                    date_str,
+                    range(start, start + length),
+                    (ow_by_hour, vc_by_hour),
+                    source=_WINDOW_SOURCES[
+                        bool(run_mask & ~vc_mask), bool(run_mask & ~ow_mask)
+                    ],
+                ))
+        
+        return windows, flyable_count
     
     def _create_window_info(
         self,
         date_str: str,
-        hours: List[int],
-        all_hourly_data: List[HourlyWeather],
+        hours: range,
+        sources_by_hour: Tuple[Dict[int, HourlyWeather], ...],
         source: str = "both"
     ) -> FlyableWindowInfo:
-        """Create a FlyableWindowInfo with statistics from the window hours."""
+        """Create a FlyableWindowInfo with statistics from the window hours of every source."""
         window_data = [
-            h for h in all_hourly_data
-            if h.date_str == date_str and h.hour in hours
+            by_hour[h] for by_hour in sources_by_hour
+            for h in hours if h in by_hour
         ]
         
         window = FlyableWindowInfo(
@@ -518,68 +629,74 @@ class WeatherAnalyzer:
         )
         
         if window_data:
-            temps = [h.temperature for h in window_data]
-            winds = [h.wind_speed for h in window_data]
-            humidities = [h.humidity for h in window_data]
-            precip_probs = [h.precipitation_probability for h in window_data]
-            cloud_bases = [h.cloud_base_m for h in window_data]
-            fog_probs = [h.fog_probability for h in window_data]
-            window.avg_temp = sum(temps) / len(temps)
-            window.min_temp = min(temps)
-            window.max_temp = max(temps)
-            window.avg_wind_speed = sum(winds) / len(winds)
-            window.max_wind_speed = max(winds)
-            window.avg_humidity = sum(humidities) / len(humidities)
-            window.max_precipitation_prob = max(precip_probs)
-            window.avg_cloud_base_m = sum(cloud_bases) / len(cloud_bases)
-            window.max_fog_probability = max(fog_probs) if fog_probs else 0
+            # One pass over the window instead of six per-field lists
+            first = window_data[0]
+            temp_sum = wind_sum = humidity_sum = cloud_base_sum = 0
+            min_temp = max_temp = first.temperature
+            max_wind = first.wind_speed
+            max_precip = first.precipitation_probability
+            max_fog = first.fog_probability
+            for h in window_data:
+                temp = h.temperature
+                temp_sum += temp
+                if temp < min_temp:
+                    min_temp = temp
+                if temp > max_temp:
+                    max_temp = temp
+                wind_sum += h.wind_speed
+                if h.wind_speed > max_wind:
+                    max_wind = h.wind_speed
+                humidity_sum += h.humidity
+                if h.precipitation_probability > max_precip:
+                    max_precip = h.precipitation_probability
+                cloud_base_sum += h.cloud_base_m
+                if h.fog_probability > max_fog:
+                    max_fog = h.fog_probability
+            n = len(window_data)
+            window.avg_temp = temp_sum / n
+            window.min_temp = min_temp
+            window.max_temp = max_temp
+            window.avg_wind_speed = wind_sum / n
+            window.max_wind_speed = max_wind
+            window.avg_humidity = humidity_sum / n
+            window.max_precipitation_prob = max_precip
+            window.avg_cloud_base_m = cloud_base_sum / n
+            window.max_fog_probability = max_fog
         
         return window
     
     def _set_current_conditions(
         self, 
         result: FullForecastAnalysis,
-        ow_hourly: List[HourlyWeather],
-        vc_hourly: List[HourlyWeather]
+        ow_by_hour: Dict[int, HourlyWeather],
+        vc_by_hour: Dict[int, HourlyWeather],
+        current_hour: int
     ) -> None:
-        """Set current weather conditions from nearest hour."""
-        now = datetime.now(self.timezone)
-        current_hour = now.hour
-        today_str = now.strftime("%Y-%m-%d")
-        
-        # Find nearest hour in OpenWeather data
-        for hourly in ow_hourly:
-            if hourly.date_str == today_str and hourly.hour == current_hour:
-                result.current_temp = hourly.temperature
-                result.current_wind_speed = hourly.wind_speed
-                result.current_wind_direction = hourly.wind_direction
-                result.current_humidity = hourly.humidity
-                result.current_cloud_base_m = hourly.cloud_base_m
-                result.current_fog_probability = hourly.fog_probability
-                break
-        
-        # Fallback to VisualCrossing
-        if result.current_temp is None:
-            for hourly in vc_hourly:
-                if hourly.date_str == today_str and hourly.hour == current_hour:
-                    result.current_temp = hourly.temperature
-                    result.current_wind_speed = hourly.wind_speed
-                    result.current_wind_direction = hourly.wind_direction
-                    result.current_humidity = hourly.humidity
-                    result.current_cloud_base_m = hourly.cloud_base_m
-                    result.current_fog_probability = hourly.fog_probability
-                    break
+        """
+        Set current weather conditions from nearest hour.
+        
+        Args:
+            result: Analysis to fill in
+            ow_by_hour: Today's OpenWeather hours
+            vc_by_hour: Today's VisualCrossing hours
+            current_hour: Hour of the analysis time
+        """
+        # Nearest hour from OpenWeather, falling back to VisualCrossing
+        hourly = ow_by_hour.get(current_hour)
+        if hourly is None or hourly.temperature is None:
+            hourly = vc_by_hour.get(current_hour) or hourly
+        
+        if hourly is not None:
+            result.current_temp = hourly.temperature
+            result.current_wind_speed = hourly.wind_speed
+            result.current_wind_direction = hourly.wind_direction
+            result.current_humidity = hourly.humidity
+            result.current_cloud_base_m = hourly.cloud_base_m
+            result.current_fog_probability = hourly.fog_probability
     
     def get_wind_direction_name(self, degrees: int) -> str:
         """Convert wind direction in degrees to compass name."""
-        directions = [
-            "С", "ССВ", "СВ", "ВСВ",
-            "В", "ВЮВ", "ЮВ", "ЮЮВ",
-            "Ю", "ЮЮЗ", "ЮЗ", "ЗЮЗ",
-            "З", "ЗСЗ", "СЗ", "ССЗ"
-        ]
-        idx = round(degrees / 22.5) % 16
-        return directions[idx]
+        return wind_direction_name(degrees)
     
     # Legacy method for backward compatibility
     def analyze(
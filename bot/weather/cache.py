@@ -0,0 +1,87 @@
+"""
+In-process cache for parsed weather API responses.
+Shared by the weather clients so both follow the same cache policy.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    LRU cache of parsed API responses with per-call TTL.
+
+    Concurrent misses for the same key share one request. Failed fetches
+    (None) are not cached; instead the last response is served while it is
+    younger than max_stale_ttls * ttl, so a short API outage does not blank
+    the forecast but a long one is reported as missing data.
+    """
+
+    def __init__(self, name: str, max_size: int = 256, max_stale_ttls: int = 3):
+        """
+        Initialize the cache.
+
+        Args:
+            name: API name used in log messages
+            max_size: Maximum number of cached responses
+            max_stale_ttls: How many TTLs an expired response may be served after a failed refresh
+        """
+        self.name = name
+        self.max_size = max_size
+        self.max_stale_ttls = max_stale_ttls
+        # key -> (fetched at, parsed response), least recently used first
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def get(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Serve a response from the cache, fetching it on a miss.
+
+        Args:
+            key: Request key
+            ttl: Cache lifetime in seconds
+            fetch: Coroutine function performing the actual request
+
+        Returns:
+            Parsed response or None on error
+        """
+        entries = self._entries
+        cached = entries.get(key)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            entries.move_to_end(key)
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        data = await asyncio.shield(task)
+        if data is None:
+            if cached is not None:
+                age = time.monotonic() - cached[0]
+                if age < ttl * self.max_stale_ttls:
+                    logger.warning(
+                        f"{self.name} refresh failed, using {age:.0f}s old response for {key}"
+                    )
+                    return cached[1]
+                # Too old to act on: forget it so later failures report no data
+                entries.pop(key, None)
+            return None
+
+        entries[key] = (time.monotonic(), data)
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+        return data
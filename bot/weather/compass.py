@@ -0,0 +1,36 @@
+"""
+Compass names for wind directions.
+"""
+
+from functools import lru_cache
+
+# 16-point compass names, clockwise from north
+WIND_DIRECTIONS = (
+    "С", "ССВ", "СВ", "ВСВ",
+    "В", "ВЮВ", "ЮВ", "ЮЮВ",
+    "Ю", "ЮЮЗ", "ЮЗ", "ЗЮЗ",
+    "З", "ЗСЗ", "СЗ", "ССЗ",
+)
+# Compass name for every whole-degree bearing
+_WIND_DIR_BY_DEG = tuple(WIND_DIRECTIONS[round(d / 22.5) % 16] for d in range(360))
+
+
+@lru_cache(maxsize=512)
+def _wind_direction_name(degrees: float) -> str:
+    """Convert a non-integer wind direction to compass name (memoized)."""
+    return WIND_DIRECTIONS[round(degrees / 22.5) % 16]
+
+
+def wind_direction_name(degrees: float) -> str:
+    """
+    Convert wind direction in degrees to compass name.
+
+    Args:
+        degrees: Wind direction, any number of degrees
+
+    Returns:
+        16-point compass name, e.g. "ССВ"
+    """
+    if type(degrees) is int:
+        return _WIND_DIR_BY_DEG[degrees % 360]
+    return _wind_direction_name(degrees)
@@ -4,18 +4,50 @@ Fetches hourly weather forecasts for specified locations.
 """
 
 import aiohttp
+import asyncio
 import logging
+import math
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+from .cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Magnus formula coefficients for dew point over water
+_MAGNUS_A = 17.27
+_MAGNUS_B = 237.7
+
+
+def _dew_point(temp: float, humidity: float) -> float:
+    """
+    Approximate dew point (°C) from temperature and relative humidity.
+    
+    Falls back to the temperature itself when humidity is not positive.
+    """
+    if humidity > 0:
+        alpha = ((_MAGNUS_A * temp) / (_MAGNUS_B + temp)) + math.log(humidity / 100.0)
+        return (_MAGNUS_B * alpha) / (_MAGNUS_A - alpha)
+    return temp
+
 
 class OpenWeatherClient:
     """Client for OpenWeatherMap API."""
     
     BASE_URL = "https://api.openweathermap.org/data/2.5"
     
+    # Connection pool settings: keep TLS connections to the API warm between
+    # checks and cache DNS, so repeated calls skip the handshake.
+    CONNECTION_LIMIT = 20
+    DNS_CACHE_TTL = 300  # seconds
+    KEEPALIVE_TIMEOUT = 75  # seconds
+    REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+    
+    # Response cache lifetimes: forecasts refresh every ~10 minutes upstream,
+    # current conditions every ~5
+    FORECAST_CACHE_TTL = 600  # seconds
+    CURRENT_CACHE_TTL = 300  # seconds
+    
     def __init__(self, api_key: str):
         """
         Initialize OpenWeather client.
@@ -25,11 +57,20 @@ class OpenWeatherClient:
         """
         self.api_key = api_key
         self._session: Optional[aiohttp.ClientSession] = None
+        self._cache = ResponseCache("OpenWeather")
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=self.CONNECTION_LIMIT,
+                ttl_dns_cache=self.DNS_CACHE_TTL,
+                keepalive_timeout=self.KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.REQUEST_TIMEOUT
+            )
         return self._session
     
     async def close(self) -> None:
@@ -45,6 +86,29 @@ class OpenWeatherClient:
         """
         Get hourly weather forecast for a location.
         
+        Responses are cached for FORECAST_CACHE_TTL seconds per coordinates.
+        
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+        
+        Returns:
+            Dictionary with hourly forecast data or None on error
+        """
+        return await self._cache.get(
+            ("forecast", round(latitude, 3), round(longitude, 3)),
+            self.FORECAST_CACHE_TTL,
+            lambda: self._fetch_hourly_forecast(latitude, longitude)
+        )
+    
+    async def _fetch_hourly_forecast(
+        self, 
+        latitude: float, 
+        longitude: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Request hourly weather forecast for a location.
+        
         Uses the free tier forecast endpoint which provides:
         - 5-day forecast with 3-hour intervals
         - Maximum 40 data points
@@ -127,14 +191,7 @@ class OpenWeatherClient:
             humidity = main.get("humidity", 0)
             
             # Approximate dew point calculation using Magnus formula
-            if humidity > 0:
-                import math
-                a = 17.27
-                b = 237.7
-                alpha = ((a * temp) / (b + temp)) + math.log(humidity / 100.0)
-                dew_point = (b * alpha) / (a - alpha)
-            else:
-                dew_point = temp
+            dew_point = _dew_point(temp, humidity)
             
             visibility_km = item.get("visibility", 10000) / 1000
             weather_main = item.get("weather", [{}])[0].get("main", "")
@@ -182,6 +239,50 @@ class OpenWeatherClient:
         """
         Get current weather for a location.
         
+        Responses are cached for CURRENT_CACHE_TTL seconds per coordinates.
+        
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+        
+        Returns:
+            Dictionary with current weather data or None on error
+        """
+        return await self._cache.get(
+            ("current", round(latitude, 3), round(longitude, 3)),
+            self.CURRENT_CACHE_TTL,
+            lambda: self._fetch_current_weather(latitude, longitude)
+        )
+    
+    async def get_hourly_and_current(
+        self,
+        latitude: float,
+        longitude: float
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Get hourly forecast and current weather concurrently.
+        
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+        
+        Returns:
+            (hourly forecast, current weather); either is None on error
+        """
+        forecast, current = await asyncio.gather(
+            self.get_hourly_forecast(latitude, longitude),
+            self.get_current_weather(latitude, longitude)
+        )
+        return forecast, current
+    
+    async def _fetch_current_weather(
+        self, 
+        latitude: float, 
+        longitude: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Request current weather for a location.
+        
         Args:
             latitude: Location latitude
             longitude: Location longitude
@@ -225,14 +326,7 @@ class OpenWeatherClient:
         humidity = main.get("humidity", 0)
         
         # Calculate dew point
-        if humidity > 0:
-            import math
-            a = 17.27
-            b = 237.7
-            alpha = ((a * temp) / (b + temp)) + math.log(humidity / 100.0)
-            dew_point = (b * alpha) / (a - alpha)
-        else:
-            dew_point = temp
+        dew_point = _dew_point(temp, humidity)
         
         visibility_km = data.get("visibility", 10000) / 1000
         weather_main = data.get("weather", [{}])[0].get("main", "")
@@ -4,18 +4,46 @@ Fetches hourly weather forecasts for specified locations.
 """
 
 import aiohttp
+import asyncio
 import logging
+import re
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+from .cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Condition keywords that mean fog regardless of visibility
+_FOG_RE = re.compile(r"fog|mist|haze|туман", re.IGNORECASE)
+
 
 class VisualCrossingClient:
     """Client for Visual Crossing Weather API."""
     
     BASE_URL = "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline"
     
+    # Connection pool settings: keep TLS connections to the API warm between
+    # checks and cache DNS, so repeated calls skip the handshake.
+    CONNECTION_LIMIT = 20
+    DNS_CACHE_TTL = 300  # seconds
+    KEEPALIVE_TIMEOUT = 60  # seconds
+    # Fifteen days of hourly data is a larger payload than OpenWeather's
+    REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+    
+    # Error bodies are only logged; large HTML error pages are cut off
+    ERROR_PREVIEW_BYTES = 512
+    
+    # Parsed responses are reused for this long per request
+    FORECAST_CACHE_TTL = 600  # seconds
+    CURRENT_CACHE_TTL = 300  # seconds
+    
+    # Fields read by _parse_current_conditions
+    CURRENT_ELEMENTS = (
+        "temp,feelslike,humidity,dew,windspeed,windgust,winddir,"
+        "visibility,uvindex,pressure,conditions,icon"
+    )
+    
     def __init__(self, api_key: str):
         """
         Initialize Visual Crossing client.
@@ -25,11 +53,34 @@ class VisualCrossingClient:
         """
         self.api_key = api_key
         self._session: Optional[aiohttp.ClientSession] = None
+        # Query strings are the same on every call; aiohttp does not modify them
+        self._forecast_params = {
+            "key": api_key,
+            "unitGroup": "metric",
+            "include": "hours,current",
+            "contentType": "json"
+        }
+        self._current_params = {
+            "key": api_key,
+            "unitGroup": "metric",
+            "include": "current",
+            "elements": self.CURRENT_ELEMENTS,
+            "contentType": "json"
+        }
+        self._cache = ResponseCache("VisualCrossing")
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=self.CONNECTION_LIMIT,
+                ttl_dns_cache=self.DNS_CACHE_TTL,
+                keepalive_timeout=self.KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.REQUEST_TIMEOUT
+            )
         return self._session
     
     async def close(self) -> None:
@@ -37,6 +88,15 @@ class VisualCrossingClient:
         if self._session and not self._session.closed:
             await self._session.close()
     
+    async def __aenter__(self) -> "VisualCrossingClient":
+        """Open the session up front for `async with` usage."""
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the session on leaving the `async with` block."""
+        await self.close()
+    
     async def get_hourly_forecast(
         self, 
         latitude: float, 
@@ -47,40 +107,83 @@ class VisualCrossingClient:
         Get hourly weather forecast for a location.
         
         Visual Crossing free tier supports up to 15 days of hourly forecast.
+        Responses are cached for FORECAST_CACHE_TTL seconds per coordinates
+        and day count (see ResponseCache for sharing and stale fallback).
         
         Args:
             latitude: Location latitude
             longitude: Location longitude
             days: Number of days to forecast (1-15, default 15 for maximum range)
         
+        Returns:
+            Dictionary with hourly forecast data or None on error
+        """
+        return await self._cache.get(
+            ("forecast", round(latitude, 3), round(longitude, 3), days),
+            self.FORECAST_CACHE_TTL,
+            lambda: self._fetch_hourly_forecast(latitude, longitude, days)
+        )
+    
+    async def get_hourly_forecast_many(
+        self,
+        coords: List[Tuple[float, float]],
+        days: int = 15,
+        concurrency: int = 8
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get hourly forecasts for several locations concurrently.
+        
+        Args:
+            coords: (latitude, longitude) pairs
+            days: Number of days to forecast (1-15)
+            concurrency: Maximum number of requests in flight at once
+        
+        Returns:
+            Forecasts in the order of coords; None where a request failed
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch_one(latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_hourly_forecast(latitude, longitude, days)
+        
+        return await asyncio.gather(
+            *(fetch_one(latitude, longitude) for latitude, longitude in coords)
+        )
+    
+    async def _fetch_hourly_forecast(
+        self, 
+        latitude: float, 
+        longitude: float,
+        days: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Request hourly weather forecast for a location.
+        
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+            days: Number of days to forecast (1-15)
+        
         Returns:
             Dictionary with hourly forecast data or None on error
         """
         session = await self._get_session()
         
         try:
-            # Build location string
-            location = f"{latitude},{longitude}"
-            
             # Date range: today to today+days (max 15 days for free tier)
-            today = datetime.utcnow().strftime("%Y-%m-%d")
-            end_date = (datetime.utcnow() + timedelta(days=min(days, 15))).strftime("%Y-%m-%d")
-            
-            url = f"{self.BASE_URL}/{location}/{today}/{end_date}"
+            now = datetime.utcnow()
+            today = now.date().isoformat()
+            end_date = (now + timedelta(days=min(days, 15))).date().isoformat()
             
-            params = {
-                "key": self.api_key,
-                "unitGroup": "metric",
-                "include": "hours,current",
-                "contentType": "json"
-            }
+            url = f"{self.BASE_URL}/{latitude},{longitude}/{today}/{end_date}"
             
-            async with session.get(url, params=params) as response:
+            async with session.get(url, params=self._forecast_params) as response:
                 if response.status == 200:
                     data = await response.json()
                     return self._parse_forecast_response(data)
                 else:
-                    error_text = await response.text()
+                    error_text = await self._error_preview(response)
                     logger.error(
                         f"VisualCrossing API error: {response.status} - {error_text}"
                     )
@@ -93,6 +196,12 @@ class VisualCrossingClient:
             logger.error(f"VisualCrossing unexpected error: {e}")
             return None
     
+    @classmethod
+    async def _error_preview(cls, response: aiohttp.ClientResponse) -> str:
+        """Read at most ERROR_PREVIEW_BYTES of an error body for logging."""
+        body = await response.content.read(cls.ERROR_PREVIEW_BYTES)
+        return body.decode("utf-8", errors="replace")
+    
     def _parse_forecast_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse Visual Crossing forecast response into standardized format.
@@ -104,6 +213,8 @@ class VisualCrossingClient:
             Standardized forecast data
         """
         hourly_data = []
+        append = hourly_data.append
+        fog_probability_of = self._fog_probability
         
         # Process each day
         for day in data.get("days", []):
@@ -111,44 +222,46 @@ class VisualCrossingClient:
             
             # Process hourly data for this day
             for hour in day.get("hours", []):
-                hour_time = hour.get("datetime", "00:00:00")
+                get = hour.get
+                hour_time = get("datetime", "00:00:00")
                 
                 # Combine date and time
                 datetime_str = f"{day_date} {hour_time}"
                 
                 # Convert epoch if available
-                timestamp = hour.get("datetimeEpoch", 0)
+                timestamp = get("datetimeEpoch", 0)
                 
-                temp = hour.get("temp", 0)
-                dew = hour.get("dew", 0)
-                visibility_km = hour.get("visibility", 10) or 10
-                conditions = hour.get("conditions", "") or ""
-                cloud_base_m = max(0, 125 * (temp - dew)) if temp > dew else 0
-                fog_probability = self._fog_probability(conditions, visibility_km)
+                temp = get("temp", 0)
+                dew = get("dew", 0)
+                visibility_km = get("visibility", 10) or 10
+                conditions = get("conditions", "") or ""
+                gust = get("windgust")
+                cloud_base_m = round(125 * (temp - dew), 0) if temp > dew else 0
+                fog_probability = fog_probability_of(conditions, visibility_km)
 
                 hourly_item = {
                     "datetime": datetime_str,
                     "timestamp": timestamp,
                     "temperature": temp,
-                    "feels_like": hour.get("feelslike", temp),
-                    "humidity": hour.get("humidity", 0),
+                    "feels_like": get("feelslike", temp),
+                    "humidity": get("humidity", 0),
                     "dew_point": dew,
-                    "wind_speed": hour.get("windspeed", 0) / 3.6,
-                    "wind_gust": hour.get("windgust", 0) / 3.6 if hour.get("windgust") else 0,
-                    "wind_direction": hour.get("winddir", 0),
-                    "cloud_base_m": round(cloud_base_m, 0),
+                    "wind_speed": get("windspeed", 0) / 3.6,
+                    "wind_gust": gust / 3.6 if gust else 0,
+                    "wind_direction": get("winddir", 0),
+                    "cloud_base_m": cloud_base_m,
                     "fog_probability": fog_probability,
-                    "precipitation_probability": hour.get("precipprob", 0),
-                    "precipitation_mm": hour.get("precip", 0) or 0,
-                    "snow_mm": hour.get("snow", 0) or 0,
+                    "precipitation_probability": get("precipprob", 0),
+                    "precipitation_mm": get("precip", 0) or 0,
+                    "snow_mm": get("snow", 0) or 0,
                     "visibility": visibility_km,
-                    "uv_index": hour.get("uvindex", 0),
-                    "pressure": hour.get("pressure", 1013),
+                    "uv_index": get("uvindex", 0),
+                    "pressure": get("pressure", 1013),
                     "weather_condition": conditions,
-                    "weather_icon": hour.get("icon", ""),
+                    "weather_icon": get("icon", ""),
                 }
                 
-                hourly_data.append(hourly_item)
+                append(hourly_item)
         
         return {
             "source": "visualcrossing",
@@ -164,8 +277,7 @@ class VisualCrossingClient:
     @staticmethod
     def _fog_probability(conditions: str, visibility_km: float) -> int:
         """Вероятность тумана 0–100% по условиям и видимости."""
-        cond = (conditions or "").lower()
-        if any(x in cond for x in ("fog", "mist", "haze", "туман")):
+        if conditions and _FOG_RE.search(conditions):
             return 100
         if visibility_km and visibility_km < 1:
             return 80
@@ -177,26 +289,28 @@ class VisualCrossingClient:
         """Parse current conditions from response."""
         if not current:
             return {}
-        temp = current.get("temp", 0)
-        dew = current.get("dew", 0)
-        visibility_km = current.get("visibility", 10) or 10
-        conditions = current.get("conditions", "") or ""
-        cloud_base_m = max(0, 125 * (temp - dew)) if temp > dew else 0
+        get = current.get
+        temp = get("temp", 0)
+        dew = get("dew", 0)
+        visibility_km = get("visibility", 10) or 10
+        conditions = get("conditions", "") or ""
+        gust = get("windgust")
+        cloud_base_m = round(125 * (temp - dew), 0) if temp > dew else 0
         fog_probability = self._fog_probability(conditions, visibility_km)
 
         return {
             "temperature": temp,
-            "feels_like": current.get("feelslike", temp),
-            "humidity": current.get("humidity", 0),
+            "feels_like": get("feelslike", temp),
+            "humidity": get("humidity", 0),
             "dew_point": dew,
-            "wind_speed": current.get("windspeed", 0) / 3.6,
-            "wind_gust": current.get("windgust", 0) / 3.6 if current.get("windgust") else 0,
-            "wind_direction": current.get("winddir", 0),
-            "cloud_base_m": round(cloud_base_m, 0),
+            "wind_speed": get("windspeed", 0) / 3.6,
+            "wind_gust": gust / 3.6 if gust else 0,
+            "wind_direction": get("winddir", 0),
+            "cloud_base_m": cloud_base_m,
             "fog_probability": fog_probability,
             "visibility": visibility_km,
-            "uv_index": current.get("uvindex", 0),
-            "pressure": current.get("pressure", 1013),
+            "uv_index": get("uvindex", 0),
+            "pressure": get("pressure", 1013),
             "weather_condition": conditions,
         }
     
@@ -208,6 +322,8 @@ class VisualCrossingClient:
         """
         Get current weather for a location.
         
+        Responses are cached for CURRENT_CACHE_TTL seconds per coordinates.
+        
         Args:
             latitude: Location latitude
             longitude: Location longitude
@@ -215,14 +331,50 @@ class VisualCrossingClient:
         Returns:
             Dictionary with current weather data or None on error
         """
-        # Use the hourly forecast endpoint but only get current day
-        forecast = await self.get_hourly_forecast(latitude, longitude, days=1)
+        return await self._cache.get(
+            ("current", round(latitude, 3), round(longitude, 3)),
+            self.CURRENT_CACHE_TTL,
+            lambda: self._fetch_current_weather(latitude, longitude)
+        )
+    
+    async def _fetch_current_weather(
+        self, 
+        latitude: float, 
+        longitude: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Request current conditions only, without the hourly forecast.
         
-        if forecast and forecast.get("current"):
-            return {
-                "source": "visualcrossing",
-                **forecast["current"],
-                "fetched_at": datetime.utcnow().isoformat()
-            }
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
         
-        return None
+        Returns:
+            Dictionary with current weather data or None on error
+        """
+        session = await self._get_session()
+        
+        try:
+            url = f"{self.BASE_URL}/{latitude},{longitude}/today"
+            
+            async with session.get(url, params=self._current_params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    current = self._parse_current_conditions(data.get("currentConditions", {}))
+                    if not current:
+                        return None
+                    return {
+                        "source": "visualcrossing",
+                        **current,
+                        "fetched_at": datetime.utcnow().isoformat()
+                    }
+                else:
+                    error_text = await self._error_preview(response)
+                    logger.error(
+                        f"VisualCrossing current API error: {response.status} - {error_text}"
+                    )
+                    return None
+        
+        except Exception as e:
+            logger.error(f"VisualCrossing current weather error: {e}")
+            return None
@@ -0,0 +1,77 @@
+"""Tests for the weather analyzer."""
+
+from datetime import UTC
+
+from bot.database.models import Location
+from bot.weather.analyzer import HourLimits, WeatherAnalyzer
+
+
+def _hourly(wind_direction: int) -> dict:
+    """One day of calm, dry hours from a single wind direction."""
+    return {
+        "hourly": [
+            {
+                "datetime": f"2024-06-01 {hour:02d}:00:00",
+                "temperature": 20.0,
+                "humidity": 50.0,
+                "dew_point": 8.0,
+                "wind_speed": 3.0,
+                "wind_gust": 5.0,
+                "wind_direction": wind_direction,
+                "precipitation_probability": 0,
+            }
+            for hour in range(24)
+        ]
+    }
+
+
+def _location(wind_directions: str) -> Location:
+    return Location(
+        chat_id=1,
+        name="Test",
+        latitude=43.9,
+        longitude=42.7,
+        id=1,
+        time_window_start=9,
+        time_window_end=18,
+        wind_directions=wind_directions,
+        wind_direction_tolerance=45,
+        required_conditions_duration_hours=2,
+    )
+
+
+def test_null_wind_directions_mean_no_direction_limit():
+    location = _location("null")
+
+    limits = HourLimits.from_location(location)
+    assert limits.allowed_directions == ()
+    assert limits.wind_direction_lut == b""
+
+    # A southerly wind would be rejected by any northern limit
+    result = WeatherAnalyzer(UTC).analyze_full_forecast(location, _hourly(180), _hourly(180))
+    assert result.has_flyable_conditions
+    assert [(w.start_hour, w.end_hour) for w in result.flyable_windows] == [(9, 18)]
+
+
+def test_wind_directions_filter_hours():
+    location = _location("[0]")
+
+    result = WeatherAnalyzer(UTC).analyze_full_forecast(location, _hourly(180), _hourly(180))
+    assert not result.has_flyable_conditions
+
+
+def test_cached_result_is_not_shared_with_callers():
+    location = _location("[]")
+    analyzer = WeatherAnalyzer(UTC)
+    ow = {**_hourly(180), "source": "openweather", "fetched_at": "2024-06-01T08:00:00"}
+    vc = {**_hourly(180), "source": "visualcrossing", "fetched_at": "2024-06-01T08:00:01"}
+
+    first = analyzer.analyze_full_forecast(location, ow, vc)
+    first.flyable_windows.clear()
+    first.rejection_reasons.append("changed by caller")
+    second = analyzer.analyze_full_forecast(location, ow, vc)
+    second.flyable_windows.clear()
+    third = analyzer.analyze_full_forecast(location, ow, vc)
+
+    assert len(third.flyable_windows) == 1
+    assert third.rejection_reasons == []